@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import re
+import string
 import time
+from collections import defaultdict
 from dataclasses import dataclass, field
-from datetime import datetime, time as dtime
-from typing import Dict, Optional, List, Tuple
+from functools import lru_cache
+from heapq import nlargest
+from datetime import datetime, timedelta, time as dtime
+from typing import Any, Dict, Optional, List, Sequence, Tuple
 
 import discord
 from discord.ext import commands, tasks
 
+from utils import jsonutil
 from utils.checks import ensure_allowed_guild_id
 from utils.timeutils import TZ, now_madrid, week_start_sunday
 
@@ -16,6 +22,37 @@ def _day_key(dt: Optional[datetime] = None) -> str:
     dt = dt or now_madrid()
     return dt.strftime("%Y-%m-%d")
 
+def _next_midnight_ts(dt: Optional[datetime] = None) -> float:
+    """Unix timestamp of the next Madrid midnight after *dt*."""
+    dt = dt or now_madrid()
+    midnight = dt.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return midnight.timestamp()
+
+# Stats writer batching: at most this many rows per transaction, waiting this long to fill a batch
+_WRITE_BATCH_MAX = 200
+_WRITE_BATCH_WAIT = 0.2
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+
+# Placeholders whose values come from SQLite
+_DB_STATUS_FIELDS = frozenset({"week_msgs", "week_top", "open_tickets"})
+
+class _SafeDict(dict):
+    def __missing__(self, key):
+        return "0"
+
+def _compile_status_template(text: str) -> string.Template:
+    """Turn "{name}" placeholders into a string.Template, escaping literal '$'."""
+    return string.Template(_PLACEHOLDER_RE.sub(r"${\1}", text.replace("$", "$$")))
+
+_ACTIVITY_TYPES = {
+    "playing": discord.ActivityType.playing,
+    "watching": discord.ActivityType.watching,
+    "listening": discord.ActivityType.listening,
+    "competing": discord.ActivityType.competing,
+}
+
+@lru_cache(maxsize=16)
 def _parse_hhmm(value: str, default: Tuple[int, int] = (0, 0)) -> Tuple[int, int]:
     try:
         parts = value.strip().split(":")
@@ -56,10 +93,10 @@ class DailyStats:
 
     commands: int = 0
     command_errors: int = 0
-    commands_by_name: Dict[str, int] = field(default_factory=dict)
+    commands_by_name: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
 
-    by_channel: Dict[int, int] = field(default_factory=dict)
-    by_user: Dict[int, int] = field(default_factory=dict)
+    by_channel: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    by_user: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
 
 class BackgroundCog(commands.Cog):
     """Background tasks & daily telemetry (config-driven).
@@ -74,11 +111,22 @@ class BackgroundCog(commands.Cog):
     def __init__(self, bot: discord.Bot):
         self.bot = bot
         self._started = False
-        self._current_day = _day_key()
+        now = now_madrid()
+        self._current_day = _day_key(now)
+        self._rollover_at = _next_midnight_ts(now)
         self.stats = DailyStats()
-        self.voice_sessions: Dict[int, int] = {}  # user_id -> unix_ts join
+        self.voice_sessions: Dict[int, float] = {}  # user_id -> time.monotonic() at join
+        # Live guild counters (non-bot members), maintained incrementally from events
+        self._in_voice_count = 0
+        self._online_count = 0
         self._status_index = -1  # start at -1 so first rotation shows the first status
         self._last_status_swap = 0.0
+        self._allowed_guild_id = 0
+        self._excluded: frozenset[int] = frozenset()
+        # Bounded so producers get back-pressure if SQLite falls behind
+        self._write_q: asyncio.Queue[Tuple[str, Sequence[Any]]] = asyncio.Queue(maxsize=1000)
+        self._writer_task: Optional[asyncio.Task] = None
+        self._refresh_config_cache()
 
     async def start_background(self):
         if self._started:
@@ -100,20 +148,10 @@ class BackgroundCog(commands.Cog):
         except Exception:
             pass
 
+        self._writer_task = asyncio.create_task(self._db_writer())
+
         # Initialize voice sessions from current state (best-effort)
-        cfg = self.bot.config
-        allowed = cfg.get_int("guild", "allowed_guild_id")
-        guild = self.bot.get_guild(allowed) if allowed else None
-        if guild:
-            now_ts = int(time.time())
-            for m in guild.members:
-                try:
-                    if m.bot:
-                        continue
-                    if m.voice and m.voice.channel:
-                        self.voice_sessions[m.id] = now_ts
-                except Exception:
-                    continue
+        self._resync_live_counts()
 
         # Start loops
         if self._daily_summary_enabled():
@@ -134,7 +172,49 @@ class BackgroundCog(commands.Cog):
         except Exception:
             pass
 
+    def _resync_live_counts(self) -> None:
+        """Recount online / in-voice members from the guild cache (start-up and after reconnects)."""
+        allowed = self._allowed_guild_id
+        guild = self.bot.get_guild(allowed) if allowed else None
+        if guild is None:
+            return
+        now_ts = time.monotonic()
+        in_voice = 0
+        online = 0
+        voice_ids = set()
+        for m in guild.members:
+            try:
+                if m.bot:
+                    continue
+                if m.voice and m.voice.channel:
+                    voice_ids.add(m.id)
+                    # keep the join time of sessions we were already tracking
+                    self.voice_sessions.setdefault(m.id, now_ts)
+                    in_voice += 1
+                if m.status != discord.Status.offline:
+                    online += 1
+            except Exception:
+                continue
+        # sessions whose leave event was missed while disconnected
+        for uid in [uid for uid in self.voice_sessions if uid not in voice_ids]:
+            self.voice_sessions.pop(uid, None)
+        self._in_voice_count = in_voice
+        self._online_count = online
+
+    @commands.Cog.listener()
+    async def on_resumed(self):
+        # presence/voice events may have been missed while the gateway was down
+        if self._started:
+            self._resync_live_counts()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # fires again after a full reconnect (new session) with a fresh member cache
+        if self._started:
+            self._resync_live_counts()
+
     def on_config_reload(self) -> None:
+        self._refresh_config_cache()
         # Restart daily loop if time changed
         try:
             if self.daily_report.is_running():
@@ -147,9 +227,14 @@ class BackgroundCog(commands.Cog):
     # --------------------
     # Config helpers
     # --------------------
-    def _excluded_channels(self) -> set[int]:
-        ids = self.bot.config.get_int_list("background", "exclude_channel_ids")
-        return set(ids)
+    def _refresh_config_cache(self) -> None:
+        cfg = self.bot.config
+        self._allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
+        self._excluded = frozenset(cfg.get_int_list("background", "exclude_channel_ids"))
+        # rotate_status ticks every 10s; parse its config once per reload
+        self._status_enabled = self._status_rotation_enabled()
+        self._status_interval = max(10, self._status_rotation_interval())
+        self._statuses = self._status_list()
 
     def _status_rotation_enabled(self) -> bool:
         return bool(self.bot.config.get("background", "status_rotation", "enabled", default=False))
@@ -167,53 +252,55 @@ class BackgroundCog(commands.Cog):
                 t = str(it.get("type", "playing")).lower()
                 txt = str(it.get("text", "")).strip()
                 if txt:
-                    out.append({"type": t, "text": txt})
+                    out.append(self._parse_status(t, txt))
             elif isinstance(it, str) and it.strip():
-                out.append({"type": "playing", "text": it.strip()})
+                out.append(self._parse_status("playing", it.strip()))
         return out
 
-    async def _render_status_text(self, guild: discord.Guild, text: str) -> str:
+    @staticmethod
+    def _parse_status(atype: str, text: str) -> dict:
+        # "static" entries have no placeholders and are sent as-is without rendering
+        fields = frozenset(_PLACEHOLDER_RE.findall(text))
+        return {
+            "type": atype,
+            "text": text,
+            "template": _compile_status_template(text),
+            "fields": fields,
+            "static": not fields,
+        }
+
+    async def _render_status_text(self, guild: discord.Guild, item: dict) -> str:
         """Replace supported placeholders inside status rotation text."""
-        class _SafeDict(dict):
-            def __missing__(self, key):
-                return "0"
-
-        now = now_madrid()
+        fields = item["fields"]
         members = guild.member_count or len(getattr(guild, 'members', []) or [])
         # online can be approximate depending on intents/Discord caching
-        try:
-            online = sum(1 for m in guild.members if (not m.bot) and m.status != discord.Status.offline)
-        except Exception:
-            online = 0
+        online = self._online_count
 
-        ws_iso = week_start_sunday(now).isoformat()
         week_msgs = 0
         week_top = ""
         open_tickets = 0
         today_msgs = int(getattr(self.stats, 'messages', 0) or 0)
 
-        try:
-            await self.bot.db.connect()
-            row = await self.bot.db.fetchone(
-                "SELECT COALESCE(SUM(count),0) AS total FROM activity_counts WHERE guild_id=? AND week_start=?",
-                (guild.id, ws_iso)
-            )
-            week_msgs = int(row["total"]) if row else 0
-            row2 = await self.bot.db.fetchone(
-                "SELECT user_id FROM activity_counts WHERE guild_id=? AND week_start=? ORDER BY count DESC LIMIT 1",
-                (guild.id, ws_iso)
-            )
-            if row2:
-                uid = int(row2["user_id"])
-                mem = guild.get_member(uid)
-                week_top = mem.display_name if mem else str(uid)
-            row3 = await self.bot.db.fetchone(
-                "SELECT COUNT(*) AS c FROM tickets WHERE guild_id=? AND status IN ('open','closing_prompted')",
-                (guild.id,)
-            )
-            open_tickets = int(row3["c"]) if row3 else 0
-        except Exception:
-            pass
+        # Only hit the DB when the template references a DB-backed placeholder
+        if fields & _DB_STATUS_FIELDS:
+            try:
+                ws_iso = week_start_sunday(now_madrid()).isoformat()
+                row = await self.bot.db.fetchone(
+                    "SELECT "
+                    "(SELECT COALESCE(SUM(count),0) FROM activity_counts WHERE guild_id=? AND week_start=?) AS total, "
+                    "(SELECT user_id FROM activity_counts WHERE guild_id=? AND week_start=? ORDER BY count DESC LIMIT 1) AS top_user, "
+                    "(SELECT COUNT(*) FROM tickets WHERE guild_id=? AND status IN ('open','closing_prompted')) AS open_tickets",
+                    (guild.id, ws_iso, guild.id, ws_iso, guild.id)
+                )
+                if row:
+                    week_msgs = int(row["total"] or 0)
+                    if row["top_user"] is not None:
+                        uid = int(row["top_user"])
+                        mem = guild.get_member(uid)
+                        week_top = mem.display_name if mem else str(uid)
+                    open_tickets = int(row["open_tickets"] or 0)
+            except Exception:
+                pass
 
         mapping = _SafeDict({
             "members": str(members),
@@ -224,9 +311,9 @@ class BackgroundCog(commands.Cog):
             "today_msgs": str(today_msgs),
         })
         try:
-            return str(text).format_map(mapping)
+            return item["template"].safe_substitute(mapping)
         except Exception:
-            return str(text)
+            return item["text"]
 
     def _daily_summary_enabled(self) -> bool:
         return bool(self.bot.config.get("background", "daily_summary", "enabled", default=False))
@@ -241,113 +328,148 @@ class BackgroundCog(commands.Cog):
         return bool(self.bot.config.get("background", "daily_summary", "reset_after_report", default=True))
 
     def _rollover_if_needed(self):
-        today = _day_key()
+        # Hot path: a single float compare until the next Madrid midnight.
+        if time.time() < self._rollover_at:
+            return
+        now = now_madrid()
+        self._rollover_at = _next_midnight_ts(now)
+        today = _day_key(now)
         if today != self._current_day:
             self._current_day = today
             self.stats = DailyStats()
             self.voice_sessions.clear()
 
+    # --------------------
+    # Batched DB writes
+    # --------------------
+    async def _enqueue_write(self, sql: str, params: Sequence[Any] = ()) -> None:
+        await self._write_q.put((sql, params))
+
+    async def _db_writer(self):
+        """Drain queued writes and commit them in batches (one transaction each).
+
+        On cancellation (cog_unload) the batch in hand and everything still queued are written
+        once more before returning; the queued statements are upserts, so a repeat is harmless.
+        """
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[str, Sequence[Any]]] = []
+        while True:
+            try:
+                batch = [await self._write_q.get()]
+                deadline = loop.time() + _WRITE_BATCH_WAIT
+                while len(batch) < _WRITE_BATCH_MAX:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._write_q.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await self.bot.db.executebatch(batch)
+                batch = []
+            except asyncio.CancelledError:
+                while not self._write_q.empty():
+                    batch.append(self._write_q.get_nowait())
+                if batch:
+                    try:
+                        await self.bot.db.executebatch(batch)
+                    except Exception:
+                        pass
+                return
+            except Exception:
+                batch = []
+                continue
+
+    def cog_unload(self):
+        # cog_unload is sync: cancelling the writer makes it flush what's pending, then exit
+        if self._writer_task:
+            self._writer_task.cancel()
+
     # --------------------
     # Event listeners
     # --------------------
+    def _precheck(self, guild: Optional[discord.Guild], author_is_bot: bool = False) -> Optional[DailyStats]:
+        """Shared listener preamble: return today's stats if the event should be counted."""
+        if author_is_bot or guild is None or guild.id != self._allowed_guild_id:
+            return None
+        self._rollover_if_needed()
+        return self.stats
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot or message.guild is None:
+        if message.channel.id in self._excluded:
             return
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(message.guild, allowed):
-            return
-        if message.channel.id in self._excluded_channels():
+        snapshot = self._precheck(message.guild, message.author.bot)
+        if snapshot is None:
             return
-
-        self._rollover_if_needed()
-        snapshot = self.stats
         snapshot.messages += 1
-        snapshot.by_channel[message.channel.id] = snapshot.by_channel.get(message.channel.id, 0) + 1
-        snapshot.by_user[message.author.id] = snapshot.by_user.get(message.author.id, 0) + 1
+        snapshot.by_channel[message.channel.id] += 1
+        snapshot.by_user[message.author.id] += 1
 
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
-        if after.guild is None or after.author.bot:
-            return
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(after.guild, allowed):
+        if after.channel.id in self._excluded:
             return
-        if after.channel.id in self._excluded_channels():
+        snapshot = self._precheck(after.guild, after.author.bot)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
         snapshot.edits += 1
 
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
-        if message.guild is None or (message.author and message.author.bot):
-            return
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(message.guild, allowed):
+        if message.channel and message.channel.id in self._excluded:
             return
-        if message.channel and message.channel.id in self._excluded_channels():
+        snapshot = self._precheck(message.guild, bool(message.author and message.author.bot))
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
         snapshot.deletes += 1
 
     @commands.Cog.listener()
     async def on_reaction_add(self, reaction: discord.Reaction, user: discord.User):
-        if user.bot or reaction.message.guild is None:
+        if reaction.message.channel.id in self._excluded:
             return
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(reaction.message.guild, allowed):
+        snapshot = self._precheck(reaction.message.guild, user.bot)
+        if snapshot is None:
             return
-        if reaction.message.channel.id in self._excluded_channels():
-            return
-        self._rollover_if_needed()
-        snapshot = self.stats
         snapshot.reactions += 1
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if member.bot or not ensure_allowed_guild_id(member.guild, allowed):
+        snapshot = self._precheck(member.guild, member.bot)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
+        if member.status != discord.Status.offline:
+            self._online_count += 1
         snapshot.joins += 1
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if member.bot or not ensure_allowed_guild_id(member.guild, allowed):
+        snapshot = self._precheck(member.guild, member.bot)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
+        if member.status != discord.Status.offline:
+            self._online_count = max(0, self._online_count - 1)
         snapshot.leaves += 1
 
     @commands.Cog.listener()
     async def on_member_ban(self, guild: discord.Guild, user: discord.User):
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(guild, allowed):
+        snapshot = self._precheck(guild)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
         snapshot.bans += 1
 
     @commands.Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User):
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(guild, allowed):
+        snapshot = self._precheck(guild)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
         snapshot.unbans += 1
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if after.bot or not ensure_allowed_guild_id(after.guild, allowed):
+        snapshot = self._precheck(after.guild, after.bot)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
         if before.premium_since is None and after.premium_since is not None:
             snapshot.boosts += 1
         elif before.premium_since is not None and after.premium_since is None:
@@ -355,51 +477,51 @@ class BackgroundCog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if member.bot or not ensure_allowed_guild_id(member.guild, allowed):
+        snapshot = self._precheck(member.guild, member.bot)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
-        now_ts = int(time.time())
+        now_ts = time.monotonic()
 
         if before.channel and not after.channel:
+            self._in_voice_count = max(0, self._in_voice_count - 1)
             joined_ts = self.voice_sessions.pop(member.id, None)
-            if joined_ts:
+            if joined_ts is not None:
                 minutes = int((now_ts - joined_ts) // 60)
                 if minutes > 0:
                     snapshot.voice_minutes += minutes
         elif after.channel and not before.channel:
+            self._in_voice_count += 1
             self.voice_sessions[member.id] = now_ts
 
         # Peak voice users snapshot
-        try:
-            in_voice = sum(1 for m in member.guild.members if (not m.bot) and m.voice and m.voice.channel)
-            snapshot.peak_voice_users = max(snapshot.peak_voice_users, in_voice)
-        except Exception:
-            pass
+        snapshot.peak_voice_users = max(snapshot.peak_voice_users, self._in_voice_count)
 
     @commands.Cog.listener()
-    async def on_application_command_completion(self, ctx: discord.ApplicationContext):
-        if ctx.guild is None:
+    async def on_presence_update(self, before: discord.Member, after: discord.Member):
+        if after.bot or not ensure_allowed_guild_id(after.guild, self._allowed_guild_id):
             return
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(ctx.guild, allowed):
+        was_online = before.status != discord.Status.offline
+        is_online = after.status != discord.Status.offline
+        if was_online and not is_online:
+            self._online_count = max(0, self._online_count - 1)
+        elif is_online and not was_online:
+            self._online_count += 1
+
+    @commands.Cog.listener()
+    async def on_application_command_completion(self, ctx: discord.ApplicationContext):
+        snapshot = self._precheck(ctx.guild)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
         snapshot.commands += 1
-        name = getattr(ctx.command, "qualified_name", None) or getattr(ctx.command, "name", "unknown")
-        snapshot.commands_by_name[str(name)] = snapshot.commands_by_name.get(str(name), 0) + 1
+        cmd = ctx.command
+        name = getattr(cmd, "qualified_name", None) or getattr(cmd, "name", "unknown")
+        snapshot.commands_by_name[str(name)] += 1
 
     @commands.Cog.listener()
     async def on_application_command_error(self, ctx: discord.ApplicationContext, error: Exception):
-        if ctx.guild is None:
-            return
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(ctx.guild, allowed):
+        snapshot = self._precheck(ctx.guild)
+        if snapshot is None:
             return
-        self._rollover_if_needed()
-        snapshot = self.stats
         snapshot.command_errors += 1
 
     # --------------------
@@ -407,17 +529,12 @@ class BackgroundCog(commands.Cog):
     # --------------------
     @tasks.loop(minutes=5)
     async def update_snapshot(self):
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
-        guild = self.bot.get_guild(allowed) if allowed else None
-        if guild is None:
+        if not self._allowed_guild_id:
             return
         self._rollover_if_needed()
         snapshot = self.stats
-        try:
-            online = sum(1 for m in guild.members if (not m.bot) and m.status != discord.Status.offline)
-            snapshot.peak_online_members = max(snapshot.peak_online_members, online)
-        except Exception:
-            pass
+        if self._online_count > snapshot.peak_online_members:
+            snapshot.peak_online_members = self._online_count
 
     @update_snapshot.before_loop
     async def _before_snapshot(self):
@@ -425,35 +542,27 @@ class BackgroundCog(commands.Cog):
 
     @tasks.loop(seconds=10)
     async def rotate_status(self):
-        if not self._status_rotation_enabled():
+        if not self._status_enabled:
             return
-        allowed = self.bot.config.get_int("guild", "allowed_guild_id")
+        allowed = self._allowed_guild_id
         guild = self.bot.get_guild(allowed) if allowed else None
         if guild is None:
             return
-        interval = max(10, self._status_rotation_interval())
         now = time.time()
-        if now - self._last_status_swap < interval:
+        if now - self._last_status_swap < self._status_interval:
             return
         self._last_status_swap = now
 
-        statuses = self._status_list()
+        statuses = self._statuses
         if not statuses:
             return
 
         self._status_index = (self._status_index + 1) % len(statuses)
         item = statuses[self._status_index]
         t = item["type"]
-        txt = item["text"]
-        txt = await self._render_status_text(guild, txt)
+        txt = item["text"] if item["static"] else await self._render_status_text(guild, item)
 
-        atype = discord.ActivityType.playing
-        if t == "watching":
-            atype = discord.ActivityType.watching
-        elif t == "listening":
-            atype = discord.ActivityType.listening
-        elif t == "competing":
-            atype = discord.ActivityType.competing
+        atype = _ACTIVITY_TYPES.get(t, discord.ActivityType.playing)
 
         try:
             await self.bot.change_presence(activity=discord.Activity(type=atype, name=txt))
@@ -516,27 +625,27 @@ class BackgroundCog(commands.Cog):
 
         embed.add_field(name="Commands", value=f"{snapshot.commands} (errors: {snapshot.command_errors})", inline=False)
 
-        top_channels = sorted(snapshot.by_channel.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        top_channels = nlargest(5, snapshot.by_channel.items(), key=lambda kv: kv[1])
         if top_channels:
             embed.add_field(
                 name="Top channels",
-                value="\n".join([f"<#{cid}> — **{cnt}**" for cid, cnt in top_channels]),
+                value="\n".join(f"<#{cid}> — **{cnt}**" for cid, cnt in top_channels),
                 inline=False
             )
 
-        top_users = sorted(snapshot.by_user.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        top_users = nlargest(5, snapshot.by_user.items(), key=lambda kv: kv[1])
         if top_users:
             embed.add_field(
                 name="Top members",
-                value="\n".join([f"<@{uid}> — **{cnt}**" for uid, cnt in top_users]),
+                value="\n".join(f"<@{uid}> — **{cnt}**" for uid, cnt in top_users),
                 inline=False
             )
 
-        top_cmds = sorted(snapshot.commands_by_name.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        top_cmds = nlargest(5, snapshot.commands_by_name.items(), key=lambda kv: kv[1])
         if top_cmds:
             embed.add_field(
                 name="Top commands",
-                value="\n".join([f"`/{name}` — **{cnt}**" for name, cnt in top_cmds]),
+                value="\n".join(f"`/{name}` — **{cnt}**" for name, cnt in top_cmds),
                 inline=False
             )
 
@@ -571,15 +680,18 @@ class BackgroundCog(commands.Cog):
                 "by_user": snapshot.by_user,
                 "commands_by_name": snapshot.commands_by_name,
             }
-            await self.bot.db.execute(
-                "INSERT OR REPLACE INTO daily_stats(guild_id, day_key, payload_json, created_ts) VALUES(?,?,?,?)",
-                (guild.id, day_key, json.dumps(payload, separators=(',', ':')), int(time.time()))
+            await self._enqueue_write(
+                "INSERT INTO daily_stats(guild_id, day_key, payload_json, created_ts) VALUES(?,?,?,?) "
+                "ON CONFLICT(guild_id, day_key) DO UPDATE SET payload_json=excluded.payload_json, created_ts=excluded.created_ts",
+                (guild.id, day_key, jsonutil.dumps(payload), int(time.time()))
             )
         except Exception:
             pass
 
         if self._daily_reset_after_report():
-            self._current_day = _day_key()
+            now = now_madrid()
+            self._current_day = _day_key(now)
+            self._rollover_at = _next_midnight_ts(now)
             self.stats = DailyStats()
             self.voice_sessions.clear()
 
@@ -2,26 +2,70 @@ from __future__ import annotations
 
 import os
 import random
-import secrets
 import asyncio
 import time
-from typing import Optional
+from dataclasses import dataclass
 
 import discord
 from discord.ext import commands
 
-from utils.checks import is_admin_or_owner, is_mod
-from utils.timeutils import now_madrid, week_start_sunday
+from utils.checks import is_admin_or_owner, is_mod, member_has_any_role
+from utils.timeutils import now_madrid, week_start_sunday, next_sunday_midnight
 from utils.errors import log_error
 
+# /tracking top leaderboard embeds are reused for this long (seconds)
+TOP_CACHE_TTL = 60.0
+
+# Hardcoded anti-spam cooldown for /gambling and /rock-paper-scissors (seconds)
+COMMAND_COOLDOWN = 10.0
+_CD_SWEEP_EVERY = 256  # prune expired cooldown entries every N checks
+
+# Rock-paper-scissors: each option beats the one before it, so the result is
+# indexed by (user_idx - bot_idx) % 3 -> tie, win, lose
+RPS_OPTIONS = ("Rock", "Paper", "Scissors")
+_RPS_OUTCOMES = ("tie", "win", "lose")
+# message per outcome: % (user choice, bot choice, streak, reward text)
+_RPS_CONTENT = {
+    "tie": "You chose **%s**. I chose **%s**. It's a **tie**!\nWin streak: **%d**%s",
+    "win": "You chose **%s**. I chose **%s**. You **win**!\nWin streak: **%d**%s",
+    "lose": "You chose **%s**. I chose **%s**. You **lose**!\nWin streak: **%d**%s",
+}
+
+def _rps_outcome(user_idx: int, bot_idx: int) -> str:
+    return _RPS_OUTCOMES[(user_idx - bot_idx) % 3]
+
+@dataclass(frozen=True)
+class GamblingConfig:
+    """/gambling settings parsed from config["fun"]["gambling"]."""
+    emojis: tuple[str, ...] = ("🍒", "🍋", "🍇", "⭐", "💎")
+    total: float = 2.5
+    rare: float = 0.01
+    win_combo: str = "💎💎💎"
+
+    @classmethod
+    def from_config(cls, gcfg: dict) -> GamblingConfig:
+        return cls(
+            emojis=tuple(gcfg.get("emojis") or cls.emojis),
+            total=float(gcfg.get("spin_total_seconds", cls.total) or cls.total),
+            rare=float(gcfg.get("rare_win_chance", cls.rare) or cls.rare),
+            win_combo=str(gcfg.get("win_combo", cls.win_combo) or cls.win_combo),
+        )
+
 class CommandsCog(commands.Cog):
     def __init__(self, bot: discord.Bot):
         self.bot = bot
         cfg = bot.config
         self.allowed_guild_id = cfg.get_int("guild", "allowed_guild_id") or 0
-        # Hardcoded anti-spam cooldowns
-        self._gamble_last_ts: dict[int, float] = {}  # user_id -> last /gambling time
-        self._rps_last_ts: dict[int, float] = {}  # user_id -> last /rock-paper-scissors time
+        # Hardcoded anti-spam cooldowns: (command, user_id) -> time.monotonic() of last use
+        self._cd: dict[tuple[str, int], float] = {}
+        self._cd_ops = 0
+        # (guild_id, week_start_iso) -> (time.monotonic() when built, leaderboard embed)
+        self._top_cache: dict[tuple[int, str], tuple[float, discord.Embed]] = {}
+        self._top_locks: dict[tuple[int, str], asyncio.Lock] = {}
+        # (week_start_iso, "YYYY-MM-DD" label), valid until _week_ends_at (epoch seconds)
+        self._week: tuple[str, str] = ("", "")
+        self._week_ends_at = 0.0
+        self._refresh_config_cache()
 
         # Command groups (guild-scoped for fast sync)
         self.tracking_group = discord.SlashCommandGroup("tracking", "Tracking commands", guild_ids=[self.allowed_guild_id] if self.allowed_guild_id else None)
@@ -58,8 +102,48 @@ class CommandsCog(commands.Cog):
         async def gambling(ctx: discord.ApplicationContext):
             await self._gambling(ctx)
 
+    def on_config_reload(self) -> None:
+        self._refresh_config_cache()
+
+    def _refresh_config_cache(self) -> None:
+        cfg = self.bot.config
+        self._excluded_role_ids = frozenset(cfg.get_int_list("roles", "excluded_tracking_role_id", default=[]))
+        self._admin_roles = frozenset(cfg.get_int_list("roles", "admin_owner_role_ids"))
+        self._mod_role_id = cfg.get_int("roles", "MOD_ROLE_ID") or 0
+        self._rps_reward_role_id = cfg.get_int("roles", "rps_streak_role_id")
+        self._gambling_reward_role_id = cfg.get_int("roles", "gambling_reward_role_id") or 0
+        self._dance_url = cfg.get_str("fun", "dance_gif_url", default="") or ""
+
+        self._gambling_cfg = GamblingConfig.from_config(cfg.get("fun", "gambling", default={}) or {})
+
     def _in_allowed_guild(self, ctx: discord.ApplicationContext) -> bool:
-        return ctx.guild is not None and ctx.guild.id == self.allowed_guild_id
+        # raw snowflake from the interaction payload; None in DMs
+        return ctx.guild_id == self.allowed_guild_id
+
+    def _current_week(self) -> tuple[str, str]:
+        """Return (week_start_iso, week_label) for the current Madrid week, recomputed only at the Sunday boundary."""
+        if time.time() >= self._week_ends_at:
+            now = now_madrid()
+            ws = week_start_sunday(now)
+            self._week = (ws.isoformat(), ws.strftime("%Y-%m-%d"))
+            self._week_ends_at = next_sunday_midnight(now).timestamp()
+        return self._week
+
+    def _check_cooldown(self, command: str, user_id: int) -> int:
+        """Return seconds left on the user's cooldown for *command*; 0 means allowed (and starts a new one)."""
+        now = time.monotonic()
+        self._cd_ops += 1
+        if self._cd_ops >= _CD_SWEEP_EVERY:
+            self._cd_ops = 0
+            cutoff = now - COMMAND_COOLDOWN
+            self._cd = {k: t for k, t in self._cd.items() if t > cutoff}
+
+        key = (command, user_id)
+        last_ts = self._cd.get(key)
+        if last_ts is not None and now - last_ts < COMMAND_COOLDOWN:
+            return int(COMMAND_COOLDOWN - (now - last_ts) + 0.999)
+        self._cd[key] = now
+        return 0
 
     # --- /tracking top ---
 
@@ -71,46 +155,75 @@ class CommandsCog(commands.Cog):
         if tracking is None:
             return await ctx.respond("Tracking cog not loaded.", ephemeral=True)
 
-        ws = week_start_sunday(now_madrid()).isoformat()
-        raw = await tracking.get_top(ctx.guild.id, ws, limit=50)  # pull more then filter
+        ws, week_label = self._current_week()
+        key = (ctx.guild.id, ws)
+        cached = self._top_cache.get(key)
+        if cached and time.monotonic() - cached[0] < TOP_CACHE_TTL:
+            return await ctx.respond(embed=cached[1])
+
+        # single-flight: concurrent /tracking top calls wait for one build, then hit the cache
+        lock = self._top_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                now = time.monotonic()
+                cached = self._top_cache.get(key)
+                if cached and now - cached[0] < TOP_CACHE_TTL:
+                    result = cached[1]
+                else:
+                    result = await self._build_top_embed(ctx.guild, tracking, ws, week_label)
+                    if isinstance(result, discord.Embed):
+                        # drop expired entries (e.g. previous weeks) before storing the new one
+                        self._top_cache = {k: v for k, v in self._top_cache.items() if now - v[0] < TOP_CACHE_TTL}
+                        self._top_cache[key] = (now, result)
+        finally:
+            # waiters keep their reference; later callers find the cached embed. Only drop our own
+            # lock: a late waiter must not remove a newer cohort's lock and let a third build in.
+            if self._top_locks.get(key) is lock:
+                del self._top_locks[key]
+
+        if isinstance(result, str):
+            return await ctx.respond(result, ephemeral=True)
+        await ctx.respond(embed=result)
+
+    async def _build_top_embed(self, guild: discord.Guild, tracking, ws: str, week_label: str) -> discord.Embed | str:
+        """Build the weekly leaderboard embed, or return the message to show when there is nothing to rank."""
+        raw = await tracking.get_top(guild.id, ws, limit=50)  # pull more then filter
 
         if not raw:
-            return await ctx.respond("No activity tracked yet this week.", ephemeral=True)
+            return "No activity tracked yet this week."
 
-        excluded_role_ids = set(self.bot.config.get_int_list("roles", "excluded_tracking_role_id", default=[]))
+        excluded_role_ids = self._excluded_role_ids
 
         top = []
+        get_member = guild._members.get  # py-cord's member cache; skips get_member's method layer
         for uid, cnt in raw:
-            member = ctx.guild.get_member(uid) if ctx.guild else None
+            member = get_member(uid)
             if member is None or member.bot:
                 continue
-            if excluded_role_ids and any(r.id in excluded_role_ids for r in member.roles):
+            if member_has_any_role(member, excluded_role_ids):  # reads Member._roles, no Role objects
                 continue
             top.append((uid, cnt))
             if len(top) >= 20:
                 break
 
         if not top:
-            return await ctx.respond("No eligible members tracked yet this week.", ephemeral=True)
+            return "No eligible members tracked yet this week."
 
-        lines = []
-        for i, (uid, cnt) in enumerate(top, start=1):
-            lines.append(f"**#{i:02d}**  <@{uid}> — **{cnt}** messages")
-
-        week_label = week_start_sunday(now_madrid()).strftime("%Y-%m-%d")
+        # header and ranking lines assembled in a single join (one final string allocation)
+        parts = [f"Week starting **{week_label}** — top {len(top)}\n"]
+        parts += [f"**#{i:02d}**  <@{uid}> — **{cnt}** messages" for i, (uid, cnt) in enumerate(top, start=1)]
         embed = discord.Embed(
             title="Weekly Activity Leaderboard",
-            description=f"Week starting **{week_label}** — top {len(top)}\n\n" + "\n".join(lines),
+            description="\n".join(parts),
         )
         try:
-            if ctx.guild and ctx.guild.icon:
-                embed.set_thumbnail(url=ctx.guild.icon.url)
+            if guild.icon:
+                embed.set_thumbnail(url=guild.icon.url)
         except Exception:
             pass
 
         embed.set_footer(text="This is the most active members, do you see yourself here?")
-        await ctx.respond(embed=embed)
-
+        return embed
 
     async def tracking_me(self, ctx: discord.ApplicationContext):
         if not self._in_allowed_guild(ctx):
@@ -120,33 +233,36 @@ class CommandsCog(commands.Cog):
         if tracking is None:
             return await ctx.respond("Tracking cog not loaded.", ephemeral=True)
 
-        ws = week_start_sunday(now_madrid()).isoformat()
+        ws, week_label = self._current_week()
         count, rank, eligible_total = await tracking.get_member_stats(ctx.guild, ws, ctx.user.id)
 
         if rank is None:
             return await ctx.respond("You are not eligible for weekly tracking (or have no tracked messages yet)", ephemeral=True)
 
-        week_label = week_start_sunday(now_madrid()).strftime("%Y-%m-%d")
-        embed = discord.Embed(title="Your Weekly Activity")
-        embed.add_field(name="Week starting", value=week_label, inline=False)
-        embed.add_field(name="Messages", value=str(count), inline=True)
-        embed.add_field(name="Rank", value=f"#{rank} of {eligible_total}", inline=True)
+        # one payload dict instead of an Embed plus three add_field calls
+        embed = discord.Embed.from_dict({
+            "title": "Your Weekly Activity",
+            "fields": [
+                {"name": "Week starting", "value": week_label, "inline": False},
+                {"name": "Messages", "value": str(count), "inline": True},
+                {"name": "Rank", "value": f"#{rank} of {eligible_total}", "inline": True},
+            ],
+        })
         await ctx.respond(embed=embed, ephemeral=True)
 
     async def tracking_force_dm(self, ctx: discord.ApplicationContext, member: discord.Member):
         if not self._in_allowed_guild(ctx):
             return await ctx.respond("Wrong server.", ephemeral=True)
 
-        admin_roles = self.bot.config.get_int_list("roles", "admin_owner_role_ids")
-        invoker = ctx.guild.get_member(ctx.user.id) if ctx.guild else None
-        if invoker is None or not is_admin_or_owner(invoker, admin_roles):
+        invoker = ctx.author if isinstance(ctx.author, discord.Member) else None
+        if invoker is None or not is_admin_or_owner(invoker, self._admin_roles):
             return await ctx.respond("You don't have permission to use this.", ephemeral=True)
 
         tracking = self.bot.get_cog("TrackingCog")
         if tracking is None:
             return await ctx.respond("Tracking cog not loaded.", ephemeral=True)
 
-        ws = week_start_sunday(now_madrid()).isoformat()
+        ws, _ = self._current_week()
         ok, msg = await tracking.force_dm_for_user(ctx.guild, ws, member.id)
         await ctx.respond(msg, ephemeral=True)
 
@@ -154,9 +270,8 @@ class CommandsCog(commands.Cog):
         if not self._in_allowed_guild(ctx):
             return await ctx.respond("Wrong server.", ephemeral=True)
 
-        member = ctx.guild.get_member(ctx.user.id)
-        admin_roles = self.bot.config.get_int_list("roles", "admin_owner_role_ids")
-        if member is None or not is_admin_or_owner(member, admin_roles):
+        member = ctx.author if isinstance(ctx.author, discord.Member) else None
+        if member is None or not is_admin_or_owner(member, self._admin_roles):
             return await ctx.respond("You don't have permission to use this.", ephemeral=True)
 
         tracking = self.bot.get_cog("TrackingCog")
@@ -164,6 +279,7 @@ class CommandsCog(commands.Cog):
             return await ctx.respond("Tracking cog not loaded.", ephemeral=True)
 
         await tracking.reset_current_week(ctx.guild.id)
+        self._top_cache.pop((ctx.guild.id, self._current_week()[0]), None)
         await ctx.respond("Tracking stats for the current week have been reset.", ephemeral=True)
 
     # --- /ticket close ---
@@ -171,9 +287,8 @@ class CommandsCog(commands.Cog):
         if not self._in_allowed_guild(ctx):
             return await ctx.respond("Wrong server.", ephemeral=True)
 
-        member = ctx.guild.get_member(ctx.user.id)
-        mod_role_id = self.bot.config.get_int("roles", "MOD_ROLE_ID") or 0
-        if member is None or not is_mod(member, mod_role_id):
+        member = ctx.author if isinstance(ctx.author, discord.Member) else None
+        if member is None or not is_mod(member, self._mod_role_id):
             return await ctx.respond("Only mods can close tickets.", ephemeral=True)
 
         # ensure this is a ticket channel
@@ -193,14 +308,14 @@ class CommandsCog(commands.Cog):
         if not self._in_allowed_guild(ctx):
             return await ctx.respond("Wrong server.", ephemeral=True)
 
-        member = ctx.guild.get_member(ctx.user.id)
-        admin_roles = self.bot.config.get_int_list("roles", "admin_owner_role_ids")
-        if member is None or not is_admin_or_owner(member, admin_roles):
+        member = ctx.author if isinstance(ctx.author, discord.Member) else None
+        if member is None or not is_admin_or_owner(member, self._admin_roles):
             return await ctx.respond("You don't have permission to use this.", ephemeral=True)
 
         await self.bot.config.reload()
 
-        # notify cogs
+        # notify cogs: they cache their config values as attributes (_refresh_config_cache)
+        # so event handlers never read the config, and re-resolve them here
         for cog in self.bot.cogs.values():
             fn = getattr(cog, "on_config_reload", None)
             if callable(fn):
@@ -222,9 +337,8 @@ class CommandsCog(commands.Cog):
         if not self._in_allowed_guild(ctx):
             return await ctx.respond("Wrong server.", ephemeral=True)
 
-        member = ctx.guild.get_member(ctx.user.id)
-        admin_roles = self.bot.config.get_int_list("roles", "admin_owner_role_ids")
-        if member is None or not is_admin_or_owner(member, admin_roles):
+        member = ctx.author if isinstance(ctx.author, discord.Member) else None
+        if member is None or not is_admin_or_owner(member, self._admin_roles):
             return await ctx.respond("You don't have permission to use this.", ephemeral=True)
 
         await ctx.respond("Restarting...", ephemeral=True)
@@ -235,10 +349,9 @@ class CommandsCog(commands.Cog):
     async def _dance(self, ctx: discord.ApplicationContext):
         if not self._in_allowed_guild(ctx):
             return await ctx.respond("Wrong server.", ephemeral=True)
-        url = self.bot.config.get_str("fun", "dance_gif_url", default="")
-        if not url:
+        if not self._dance_url:
             return await ctx.respond("Dance GIF not configured.", ephemeral=True)
-        await ctx.respond(url)
+        await ctx.respond(self._dance_url)
 
     # --- /rps ---
     async def _rps(self, ctx: discord.ApplicationContext):
@@ -246,139 +359,40 @@ class CommandsCog(commands.Cog):
             return await ctx.respond("Wrong server.", ephemeral=True)
 
         # Anti-spam: hardcoded 10s cooldown per user for /rock-paper-scissors
-        now_ts = time.time()
-        last_ts = self._rps_last_ts.get(ctx.user.id, 0.0)
-        if now_ts - last_ts < 10.0:
-            remaining = int(10 - (now_ts - last_ts) + 0.999)
+        remaining = self._check_cooldown("rps", ctx.user.id)
+        if remaining:
             return await ctx.respond(f"Slow down... try again in {remaining}s", ephemeral=True)
-        self._rps_last_ts[ctx.user.id] = now_ts
-
-        parent = self
-        options = ["Rock", "Paper", "Scissors"]
-        nonce = secrets.token_hex(4)
-
-        def outcome(user: str, bot: str) -> str:
-            if user == bot:
-                return "tie"
-            wins = {("Rock", "Scissors"), ("Paper", "Rock"), ("Scissors", "Paper")}
-            return "win" if (user, bot) in wins else "lose"
-
-        class RPSView(discord.ui.View):
-            def __init__(self, user_id: int):
-                super().__init__(timeout=60)
-                self.user_id = user_id
-
-                for opt in options:
-                    btn = discord.ui.Button(
-                        label=opt,
-                        style=discord.ButtonStyle.primary,
-                        custom_id=f"rps:{nonce}:{opt.lower()}",
-                    )
-                    btn.callback = self._make_callback(opt)
-                    self.add_item(btn)
-
-            def _make_callback(self, choice: str):
-                async def _cb(interaction: discord.Interaction):
-                    try:
-                        if interaction.user.id != self.user_id:
-                            return await interaction.response.send_message("This game isn't for you.", ephemeral=True)
-
-                        bot_choice = random.choice(options)
-                        o = outcome(choice, bot_choice)
-
-                        guild_id = interaction.guild.id if interaction.guild else parent.allowed_guild_id
-                        user_id = interaction.user.id
-
-                        if o == "win":
-                            streak = await parent._rps_update_streak(guild_id, user_id, new_value=None, increment=True)
-                        elif o == "lose":
-                            await parent._rps_update_streak(guild_id, user_id, new_value=0, increment=False)
-                            streak = 0
-                        else:
-                            # Tie: do not reset or increment streak
-                            streak = await parent._rps_get_streak(guild_id, user_id)
-
-                        reward_text = ""
-                        cfg = parent.bot.config
-                        reward_role_id = cfg.get_int("roles", "rps_streak_role_id")
-                        if o == "win" and reward_role_id and streak >= 5 and interaction.guild:
-                            role = interaction.guild.get_role(reward_role_id)
-                            member = interaction.guild.get_member(user_id)
-                            if role and member and role not in member.roles:
-                                try:
-                                    await member.add_roles(role, reason="RPS 5-win streak reward")
-                                    reward_text = f"\n\n🏆 **5-win streak!** You earned **{role.name}**."
-                                except Exception:
-                                    reward_text = "\n\n🏆 **5-win streak!** (Could not assign the role, permissions/role hierarchy.)"
-                            # Reset after awarding so it doesn't award forever
-                            await parent._rps_update_streak(guild_id, user_id, new_value=0, increment=False)
-                            streak = 0
-
-                        if o == "win":
-                            result_line = "You **win**!"
-                        elif o == "lose":
-                            result_line = "You **lose**!"
-                        else:
-                            result_line = "It's a **tie**!"
-
-                        content = (
-                            f"You chose **{choice}**. I chose **{bot_choice}**. {result_line}"
-                            f"\nWin streak: **{streak}**"
-                            f"{reward_text}"
-                        )
-
-                        await interaction.response.defer()
-                        await interaction.message.edit(content=content, view=None)
-                    except Exception as e:
-                        try:
-                            if interaction.response.is_done():
-                                await interaction.followup.send("Something went wrong.", ephemeral=True)
-                            else:
-                                await interaction.response.send_message("Something went wrong.", ephemeral=True)
-                        except Exception:
-                            pass
-                        await log_error(parent.bot, f"RPS view error: {repr(e)}")
-                return _cb
-
-        await ctx.respond("Choose:", view=RPSView(ctx.user.id))
-
-    async def _rps_get_streak(self, guild_id: int, user_id: int) -> int:
-        """Return current RPS win streak without modifying it."""
-        await self.bot.db.connect()
-        row = await self.bot.db.fetchone(
-            "SELECT streak FROM rps_streaks WHERE guild_id=? AND user_id=?",
-            (guild_id, user_id)
-        )
-        return int(row["streak"]) if row else 0
 
-    async def _rps_update_streak(self, guild_id: int, user_id: int, new_value: Optional[int], increment: bool) -> int:
-        """Update and return a user's RPS win streak.
+        await ctx.respond("Choose:", view=RPSView(self, ctx.user.id, f"{random.getrandbits(32):08x}"))
 
-        - If increment=True, increments current streak by 1.
-        - If new_value is not None, sets streak to that value (used for reset).
-        """
-        await self.bot.db.connect()
+    async def _rps_apply(self, guild_id: int, user_id: int, outcome: str) -> int:
+        """Apply a game outcome to the user's RPS win streak and return the new value.
 
-        if new_value is not None:
-            await self.bot.db.execute(
-                "INSERT INTO rps_streaks(guild_id,user_id,streak,updated_ts) VALUES(?,?,?,?) "
-                "ON CONFLICT(guild_id,user_id) DO UPDATE SET streak=excluded.streak, updated_ts=excluded.updated_ts",
-                (guild_id, user_id, int(new_value), int(time.time()))
+        - "win" increments the streak, "lose" resets it to 0 (one upsert with RETURNING).
+        - "tie" leaves it untouched and just reads it.
+        """
+        if outcome == "tie":
+            row = await self.bot.db.fetchone(
+                "SELECT streak FROM rps_streaks WHERE guild_id=? AND user_id=?",
+                (guild_id, user_id)
             )
-            return int(new_value)
+            return int(row["streak"]) if row else 0
 
-        row = await self.bot.db.fetchone(
-            "SELECT streak FROM rps_streaks WHERE guild_id=? AND user_id=?",
-            (guild_id, user_id)
+        # excluded.streak is 1 for a win (increment) and 0 for a loss (reset)
+        row = await self.bot.db.execute_returning(
+            "INSERT INTO rps_streaks(guild_id,user_id,streak,updated_ts) VALUES(?,?,?,?) "
+            "ON CONFLICT(guild_id,user_id) DO UPDATE SET "
+            "streak=CASE WHEN excluded.streak=1 THEN rps_streaks.streak+1 ELSE 0 END, updated_ts=excluded.updated_ts "
+            "RETURNING streak",
+            (guild_id, user_id, 1 if outcome == "win" else 0, int(time.time()))
         )
-        cur = int(row["streak"]) if row else 0
-        cur = cur + 1 if increment else 0
+        return int(row["streak"]) if row else 0
+
+    async def _rps_reset_streak(self, guild_id: int, user_id: int) -> None:
         await self.bot.db.execute(
-            "INSERT INTO rps_streaks(guild_id,user_id,streak,updated_ts) VALUES(?,?,?,?) "
-            "ON CONFLICT(guild_id,user_id) DO UPDATE SET streak=excluded.streak, updated_ts=excluded.updated_ts",
-            (guild_id, user_id, cur, int(time.time()))
+            "UPDATE rps_streaks SET streak=0, updated_ts=? WHERE guild_id=? AND user_id=?",
+            (int(time.time()), guild_id, user_id)
         )
-        return cur
 
     # --- /gambling ---
     async def _gambling(self, ctx: discord.ApplicationContext):
@@ -386,47 +400,37 @@ class CommandsCog(commands.Cog):
             return await ctx.respond("Wrong server.", ephemeral=True)
 
         # Anti-spam: hardcoded 10s cooldown per user for /gambling
-        now_ts = time.time()
-        last_ts = self._gamble_last_ts.get(ctx.user.id, 0.0)
-        if now_ts - last_ts < 10.0:
-            remaining = int(10 - (now_ts - last_ts) + 0.999)
+        remaining = self._check_cooldown("gambling", ctx.user.id)
+        if remaining:
             return await ctx.respond(f"Slow down... try again in {remaining}s", ephemeral=True)
-        self._gamble_last_ts[ctx.user.id] = now_ts
-        cfg = self.bot.config
-        gcfg = cfg.get("fun", "gambling", default={}) or {}
-        emojis = gcfg.get("emojis", ["🍒","🍋","🍇","⭐","💎"])
-        interval = float(gcfg.get("spin_interval_seconds", 0.5) or 0.5)
-        total = float(gcfg.get("spin_total_seconds", 2.5) or 2.5)
-        rare = float(gcfg.get("rare_win_chance", 0.01) or 0.01)
-        win_combo = str(gcfg.get("win_combo", "💎💎💎") or "💎💎💎")
-
-        reward_role_id = cfg.get_int("roles", "gambling_reward_role_id") or 0
+        g = self._gambling_cfg
+        emojis = g.emojis
+
+        reward_role_id = self._gambling_reward_role_id
         role = ctx.guild.get_role(reward_role_id) if reward_role_id else None
 
         await ctx.respond("Spinning…")
         msg = await ctx.interaction.original_response()
 
-        # animate edits
-        steps = max(1, int(total / interval))
-        current = ""
-        for _ in range(steps):
-            current = "".join(random.choice(emojis) for _ in range(3))
-            try:
-                await msg.edit(content=f"{current}")
-            except Exception:
-                pass
-            await asyncio.sleep(interval)
+        # One interim frame halfway through rather than an edit per frame,
+        # which kept the message route close to Discord's edit rate limit.
+        await asyncio.sleep(g.total / 2)
+        try:
+            await msg.edit(content="".join(random.choices(emojis, k=3)))
+        except Exception:
+            pass
+        await asyncio.sleep(g.total / 2)
 
         # final result
-        final = "".join(random.choice(emojis) for _ in range(3))
+        final = "".join(random.choices(emojis, k=3))
         won = False
-        if random.random() < rare:
-            final = win_combo
+        if random.random() < g.rare:
+            final = g.win_combo
             won = True
 
         content = f"🎰 **{final}** 🎰\n"
         if won and role is not None:
-            member = ctx.guild.get_member(ctx.user.id)
+            member = ctx.author if isinstance(ctx.author, discord.Member) else None
             if member and role not in member.roles:
                 try:
                     await member.add_roles(role, reason="Gambling win")
@@ -443,5 +447,74 @@ class CommandsCog(commands.Cog):
         except Exception:
             pass
 
+class RPSView(discord.ui.View):
+    """Per-game /rock-paper-scissors buttons; custom_ids end in the RPS_OPTIONS index."""
+
+    def __init__(self, cog: CommandsCog, user_id: int, nonce: str):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.user_id = user_id
+
+        for idx, opt in enumerate(RPS_OPTIONS):
+            btn = discord.ui.Button(
+                label=opt,
+                style=discord.ButtonStyle.primary,
+                custom_id=f"rps:{nonce}:{idx}",
+            )
+            btn.callback = self._handle
+            self.add_item(btn)
+
+    async def _handle(self, interaction: discord.Interaction):
+        parent = self.cog
+        try:
+            if interaction.user.id != self.user_id:
+                return await interaction.response.send_message("This game isn't for you.", ephemeral=True)
+
+            choice_idx = int(interaction.data["custom_id"].rsplit(":", 1)[1])
+            bot_idx = random.randrange(3)
+            o = _rps_outcome(choice_idx, bot_idx)
+            choice = RPS_OPTIONS[choice_idx]
+            bot_choice = RPS_OPTIONS[bot_idx]
+
+            guild_id = interaction.guild.id if interaction.guild else parent.allowed_guild_id
+            user_id = interaction.user.id
+
+            streak = await parent._rps_apply(guild_id, user_id, o)
+
+            reward_text = ""
+            reward_role_id = parent._rps_reward_role_id
+            if o == "win" and reward_role_id and streak >= 5 and interaction.guild:
+                role = interaction.guild.get_role(reward_role_id)
+                member = interaction.user if isinstance(interaction.user, discord.Member) else None
+                # Reset after awarding so it doesn't award forever; the role add (REST)
+                # and the streak reset (DB) are independent, so run them together
+                if role and member and role not in member.roles:
+                    added, _ = await asyncio.gather(
+                        member.add_roles(role, reason="RPS 5-win streak reward"),
+                        parent._rps_reset_streak(guild_id, user_id),
+                        return_exceptions=True,
+                    )
+                    if isinstance(added, BaseException):
+                        reward_text = "\n\n🏆 **5-win streak!** (Could not assign the role, permissions/role hierarchy.)"
+                    else:
+                        reward_text = f"\n\n🏆 **5-win streak!** You earned **{role.name}**."
+                else:
+                    await parent._rps_reset_streak(guild_id, user_id)
+                streak = 0
+
+            content = _RPS_CONTENT[o] % (choice, bot_choice, streak, reward_text)
+
+            await interaction.response.defer()
+            await interaction.message.edit(content=content, view=None)
+        except Exception as e:
+            try:
+                if interaction.response.is_done():
+                    await interaction.followup.send("Something went wrong.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("Something went wrong.", ephemeral=True)
+            except Exception:
+                pass
+            await log_error(parent.bot, f"RPS view error: {repr(e)}")
+
 def setup(bot: discord.Bot):
     bot.add_cog(CommandsCog(bot))
@@ -2,15 +2,17 @@ from __future__ import annotations
 
 import asyncio
 import io
-import json
 import re
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Optional, Dict, Any, Tuple
 
 import discord
 from discord.ext import commands
 
-from utils.checks import ensure_allowed_guild_id, is_mod
+from utils import jsonutil
+from utils.checks import is_mod
 from utils.views import HelpMenuView, HelpModConfirmView, TicketClosePromptView, TranscriptRequestView
 from utils.transcript import build_text_transcript
 from utils.timeutils import now_madrid, week_start_sunday
@@ -18,6 +20,38 @@ from utils.timeutils import now_madrid, week_start_sunday
 
 pinged_role_for_tickets = "<@&1462403598028640296>"
 
+# Ticket references in transcript requests: a channel mention, or a bare/T-prefixed id
+_CHANNEL_MENTION_RE = re.compile(r"<#(\d{15,25})>")
+_TICKET_REF_RE = re.compile(r"\bT?(\d{1,25})\b", re.I | re.ASCII)
+
+# Buffered ticket activity timestamps are written at most this often (seconds)
+ACTIVITY_FLUSH_INTERVAL = 5
+
+# Bounds for the ticket inactivity scan's sleep between passes (seconds)
+SCAN_MIN_INTERVAL = 60
+SCAN_MAX_INTERVAL = 3600
+
+# First retry delay for a stale ticket whose channel is gone or whose close prompt failed;
+# doubles per failure up to SCAN_MAX_INTERVAL so such tickets can't pin the scan at its floor
+PROMPT_RETRY_MIN = 600
+
+# Message types a person actually typed (system messages are ignored)
+_USER_MESSAGE_TYPES = (discord.MessageType.default, discord.MessageType.reply)
+
+# In-memory help sessions kept before the least recently used ones fall back to SQLite
+HELP_SESSION_CACHE_MAX = 1000
+
+# Help menu action cooldowns (seconds)
+HELP_COOLDOWNS = {
+    "appeal": 48 * 3600,
+    "report_user": 24 * 3600,
+    "bot_issue": 6 * 3600,
+    "transcript": 8 * 3600,
+}
+
+def _loads_session(raw: Optional[str]) -> Dict[str, Any]:
+    return jsonutil.loads(raw) if raw else {}
+
 def _format_duration(seconds: int) -> str:
     seconds = max(0, int(seconds))
     if seconds < 60:
@@ -32,6 +66,50 @@ def _format_duration(seconds: int) -> str:
     return f"{days}d"
 
 
+@dataclass(frozen=True)
+class HelpAction:
+    """Help menu option that starts a DM help session behind a per-user cooldown."""
+    cooldown_key: str
+    label: str  # shown in the cooldown message
+    stage: str
+    title: str
+    description: str
+    warn_false_reports: bool = False
+
+
+HELP_ACTIONS: Dict[str, HelpAction] = {
+    "appeal": HelpAction(
+        cooldown_key="appeal",
+        label="Appeal punishment",
+        stage="appeal_punishment",
+        title="Appeal punishment",
+        description="You can appeal either by our [google form](https://forms.gle/1fgqKtyo6okiQzjBA) or directly here.\n\nIf you chose the **first one**, click the link above and type **cancel**. If you chose the second one, please **state the reason for you punishment and what happened.**",
+    ),
+    "report": HelpAction(
+        cooldown_key="report_user",
+        label="Report a user/message",
+        stage="report_details",
+        title="Report a user",
+        description="Please send the message link (preferred) OR user ID along with the reason for your report with evidence.\n\nType **cancel** to stop.",
+        warn_false_reports=True,
+    ),
+    "bot_issue": HelpAction(
+        cooldown_key="bot_issue",
+        label="Report a bot issue",
+        stage="bot_issue_details",
+        title="Report a bot issue",
+        description="Please describe the bot issue/bug, and include screenshots or steps to reproduce/explanation in a single message.\n\nType **cancel** to stop.",
+    ),
+    "transcript": HelpAction(
+        cooldown_key="transcript",
+        label="Request transcript",
+        stage="transcript_ticket",
+        title="Request transcript",
+        description="Send your **ticket channel** (mention like <#123> or ID), or your **Ticket ID** (example: `T21`).\n\nType **cancel** to stop.",
+    ),
+}
+
+
 class HelpCog(commands.Cog):
     """DM help system + ticket system helpers + transcript requests."""
 
@@ -39,15 +117,130 @@ class HelpCog(commands.Cog):
         self.bot = bot
         self._ticket_scan_task: Optional[asyncio.Task] = None
         self._started = False
+        # channel_id -> status ('open' / 'closing_prompted') for active ticket channels
+        self._open_tickets: Dict[int, str] = {}
+        # channel_id -> latest user message ts, written in batches by _activity_flush_loop
+        self._activity_buffer: Dict[int, int] = {}
+        self._activity_flush_task: Optional[asyncio.Task] = None
+        # set when a ticket (re)enters 'open', so the scan loop recomputes its wake-up time
+        self._tickets_changed = asyncio.Event()
+        # channel_id -> (retry not before, current backoff) for tickets the scan couldn't prompt
+        self._prompt_backoff: Dict[int, Tuple[float, float]] = {}
+        # (guild_id, user_id) -> {"stage", "data"}; mirrors help_sessions so DMs without
+        # a session skip SQLite. Until loaded, or once entries were evicted, misses hit the DB.
+        self._sessions: OrderedDict[Tuple[int, int], Dict[str, Any]] = OrderedDict()
+        self._sessions_complete = False
+        # transcript requests between their duplicate check and their INSERT, keyed like the check
+        self._transcript_inflight: set = set()
+        # Stateless persistent button views (timeout=None, fixed custom_ids): one shared
+        # instance each instead of a new View per message.
+        self._close_prompt_view = TicketClosePromptView()
+        self._mod_confirm_view = HelpModConfirmView()
+        self._transcript_request_view = TranscriptRequestView()
+        self._help_menu_embed = discord.Embed(
+            title="Help Menu",
+            description="Hello! What do you need help with?\nSelect an option below",
+        )
+        self._refresh_config_cache()
 
     async def start_background(self):
         if self._started:
             return
         self._started = True
+        await self._load_open_tickets()
+        await self._load_help_sessions()
         self._ticket_scan_task = asyncio.create_task(self._ticket_scan_loop())
+        self._activity_flush_task = asyncio.create_task(self._activity_flush_loop())
+
+    def cog_unload(self):
+        for task in (self._ticket_scan_task, self._activity_flush_task):
+            if task:
+                task.cancel()
+        # cog_unload is sync; hand the buffered ticket activity to one last flush
+        if self._activity_buffer:
+            try:
+                asyncio.get_running_loop().create_task(self._flush_ticket_activity())
+            except Exception:
+                pass
 
     def on_config_reload(self) -> None:
-        pass
+        self._refresh_config_cache()
+
+    def _refresh_config_cache(self) -> None:
+        cfg = self.bot.config
+        self._allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
+        self._mod_role_id = cfg.get_int("roles", "MOD_ROLE_ID") or 0
+        self._excluded_role_id = cfg.get_int("roles", "excluded_tracking_role_id")
+        self._inactivity_hours = int(cfg.get("tickets", "ticket_inactivity_hours", default=24) or 24)
+        self._ticket_cooldown_h = int(cfg.get("tickets", "ticket_creation_cooldown_hours", default=24) or 24)
+        self._ticket_category_id = cfg.get_int("tickets", "ticket_category_id")
+        self._report_warning_enabled = bool(cfg.get("help", "report_warning_enabled", default=True))
+        self._appeals_ch_id = cfg.get_int("channels", "appeals_log_channel_id")
+        self._reports_ch_id = cfg.get_int("channels", "reports_log_channel_id")
+        self._bot_issues_ch_id = cfg.get_int("channels", "bot_issues_log_channel_id")
+        self._transcript_req_ch_id = cfg.get_int("channels", "transcript_requests_channel_id")
+        self._log_channel_id = cfg.get_int("channels", "general_logging_channel_id")
+        self._faq_embed = self._build_faq_embed()
+        # guild_id -> shared part of a ticket channel's overwrites (everyone + mod role)
+        self._overwrites_proto: Dict[int, Dict[Any, discord.PermissionOverwrite]] = {}
+
+    # -----------------------------
+    # Open ticket index
+    # -----------------------------
+    async def _load_open_tickets(self) -> None:
+        try:
+            rows = await self.bot.db.fetchall(
+                "SELECT channel_id, status FROM tickets WHERE status IN ('open','closing_prompted')"
+            )
+        except Exception:
+            return
+        self._open_tickets = {int(r["channel_id"]): str(r["status"]) for r in rows}
+
+    def register_ticket(self, channel_id: int, status: str = "open") -> None:
+        previous = self._open_tickets.get(channel_id)
+        self._open_tickets[channel_id] = status
+        # only a ticket (re)entering 'open' moves the scan's wake-up time
+        if status == "open" and previous != "open":
+            self._tickets_changed.set()
+
+    def unregister_ticket(self, channel_id: int) -> None:
+        self._open_tickets.pop(channel_id, None)
+        self._activity_buffer.pop(channel_id, None)
+        self._prompt_backoff.pop(channel_id, None)
+
+    def _back_off_prompt(self, channel_id: int, now: float) -> None:
+        _, prev = self._prompt_backoff.get(channel_id, (0.0, 0.0))
+        backoff = min(SCAN_MAX_INTERVAL, prev * 2) if prev else PROMPT_RETRY_MIN
+        self._prompt_backoff[channel_id] = (now + backoff, backoff)
+
+    async def _activity_flush_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(ACTIVITY_FLUSH_INTERVAL)
+                await self._flush_ticket_activity()
+            except asyncio.CancelledError:
+                return
+            except Exception:
+                continue
+
+    async def _flush_ticket_activity(self) -> None:
+        if not self._activity_buffer:
+            return
+        rows = [(ts, cid) for cid, ts in self._activity_buffer.items()]
+        self._activity_buffer.clear()
+        # status guard: a ticket closed since the message was buffered stays closed
+        try:
+            await self.bot.db.executemany(
+                "UPDATE tickets SET last_user_activity_ts=?, status='open' "
+                "WHERE channel_id=? AND status IN ('open','closing_prompted')",
+                rows,
+            )
+        except Exception:
+            # put them back for the next flush, unless newer activity arrived or the ticket closed
+            for ts, cid in rows:
+                if cid in self._open_tickets:
+                    self._activity_buffer.setdefault(cid, ts)
+            raise
 
     # -----------------------------
     # Ticket inactivity scanning
@@ -55,110 +248,166 @@ class HelpCog(commands.Cog):
     async def _ticket_scan_loop(self):
         while True:
             try:
-                await asyncio.sleep(600)  # every 10 minutes
+                delay = await self._next_scan_delay()
+                self._tickets_changed.clear()
+                try:
+                    await asyncio.wait_for(self._tickets_changed.wait(), timeout=delay)
+                    continue  # a ticket was (re)opened: recompute the wake-up time
+                except asyncio.TimeoutError:
+                    pass
                 await self._scan_tickets()
             except asyncio.CancelledError:
                 return
             except Exception:
-                continue
+                await asyncio.sleep(SCAN_MIN_INTERVAL)
+
+    async def _next_scan_delay(self) -> float:
+        """Seconds until the oldest open ticket can go inactive, clamped to the scan interval bounds.
+
+        Tickets backing off after a failed prompt are left out of the MIN and count at their retry time.
+        """
+        allowed_guild_id = self._allowed_guild_id
+        if not allowed_guild_id:
+            return SCAN_MAX_INTERVAL
+        now = time.time()
+        row = await self.bot.db.fetchone(
+            "SELECT MIN(last_user_activity_ts) AS m FROM tickets WHERE guild_id=? AND status='open' "
+            "AND channel_id NOT IN (SELECT value FROM json_each(?))",
+            (allowed_guild_id, jsonutil.dumps(list(self._prompt_backoff))),
+        )
+        candidates = [retry_at - now for retry_at, _ in self._prompt_backoff.values()]
+        if row and row["m"] is not None:
+            candidates.append(int(row["m"]) + self._inactivity_hours * 3600 - now)
+        if not candidates:
+            return SCAN_MAX_INTERVAL
+        return max(SCAN_MIN_INTERVAL, min(SCAN_MAX_INTERVAL, min(candidates)))
 
     async def _scan_tickets(self):
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
+        allowed_guild_id = self._allowed_guild_id
         guild = self.bot.get_guild(allowed_guild_id) if allowed_guild_id else None
         if guild is None:
             return
 
-        inactivity_hours = int(cfg.get("tickets", "ticket_inactivity_hours", default=24) or 24)
-        cutoff = int(time.time()) - inactivity_hours * 3600
+        cutoff = int(time.time()) - self._inactivity_hours * 3600
+        await self._flush_ticket_activity()
 
         rows = await self.bot.db.fetchall(
             "SELECT channel_id FROM tickets WHERE guild_id=? AND status='open' AND last_user_activity_ts<=?",
             (guild.id, cutoff),
         )
+        now = time.time()
+        channels = []
         for r in rows:
-            channel_id = int(r["channel_id"])
-            channel = guild.get_channel(channel_id)
-            if not isinstance(channel, discord.TextChannel):
-                continue
-            try:
-                await channel.send("Do you want to close the ticket?", view=TicketClosePromptView())
-                await self.bot.db.execute("UPDATE tickets SET status='closing_prompted' WHERE channel_id=?", (channel_id,))
-            except Exception:
+            cid = int(r["channel_id"])
+            backoff = self._prompt_backoff.get(cid)
+            if backoff is not None and backoff[0] > now:
                 continue
+            channel = guild.get_channel(cid)
+            if isinstance(channel, discord.TextChannel):
+                channels.append(channel)
+            else:
+                self._back_off_prompt(cid, now)
+        if not channels:
+            return
+
+        # prompt every stale ticket concurrently, then mark the delivered ones in one batch
+        results = await asyncio.gather(
+            *(ch.send("Do you want to close the ticket?", view=self._close_prompt_view) for ch in channels),
+            return_exceptions=True,
+        )
+        prompted = []
+        for ch, res in zip(channels, results):
+            if isinstance(res, BaseException):
+                self._back_off_prompt(ch.id, now)
+            else:
+                self._prompt_backoff.pop(ch.id, None)
+                prompted.append(ch.id)
+        if not prompted:
+            return
+        try:
+            await self.bot.db.executemany(
+                "UPDATE tickets SET status='closing_prompted' WHERE channel_id=?",
+                [(cid,) for cid in prompted],
+            )
+        except Exception:
+            return
+        for cid in prompted:
+            self.register_ticket(cid, "closing_prompted")
 
     # -----------------------------
     # Listener: ticket activity + DM help
     # -----------------------------
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot:
+        # cheap synchronous filters first: bots, webhooks and system messages never matter here
+        if message.author.bot or message.webhook_id is not None:
+            return
+        if message.type not in _USER_MESSAGE_TYPES:
             return
-
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        guild = self.bot.get_guild(allowed_guild_id) if allowed_guild_id else None
 
         # Ticket activity in guild
-        if message.guild is not None and ensure_allowed_guild_id(message.guild, allowed_guild_id):
-            row = await self.bot.db.fetchone("SELECT status FROM tickets WHERE channel_id=?", (message.channel.id,))
-            if row and row["status"] in ("open", "closing_prompted"):
-                await self.bot.db.execute(
-                    "UPDATE tickets SET last_user_activity_ts=?, status='open' WHERE channel_id=?",
-                    (int(time.time()), message.channel.id),
-                )
+        if message.guild is not None:
+            # in-memory index; the DB write is batched by _activity_flush_loop
+            if message.guild.id == self._allowed_guild_id and message.channel.id in self._open_tickets:
+                self._activity_buffer[message.channel.id] = int(time.time())
+                self.register_ticket(message.channel.id)
             return
 
         # DM help
-        if message.guild is None:
-            if guild is None:
-                return
-            member = guild.get_member(message.author.id)
-            if member is None:
-                return  # ignore DMs from non-members
+        allowed_guild_id = self._allowed_guild_id
+        guild = self.bot.get_guild(allowed_guild_id) if allowed_guild_id else None
+        if guild is None:
+            return
+        member = guild.get_member(message.author.id)
+        if member is None:
+            return  # ignore DMs from non-members
 
-            tracking = self.bot.get_cog("TrackingCog")
-            if tracking and await tracking.user_in_weekly_process(message.author.id):
-                return
+        tracking = self.bot.get_cog("TrackingCog")
+        if tracking and await tracking.user_in_weekly_process(message.author.id):
+            return
 
-            if await self._handle_help_session_message(guild, message):
-                return
+        if await self._handle_help_session_message(guild, message):
+            return
 
-            embed = discord.Embed(
-                title="Help Menu",
-                description="Hello! What do you need help with?\nSelect an option below",
-            )
-            try:
-                await message.channel.send(embed=embed, view=HelpMenuView())
-            except Exception:
-                pass
+        try:
+            await message.channel.send(embed=self._help_menu_embed, view=HelpMenuView())
+        except Exception:
+            pass
 
     # -----------------------------
     # Cooldowns (help actions)
     # -----------------------------
-    async def _remaining_help_cooldown(self, guild_id: int, user_id: int, action: str, cooldown_seconds: int) -> int:
-        row = await self.bot.db.fetchone(
-            "SELECT last_used_ts FROM help_cooldowns WHERE guild_id=? AND user_id=? AND action=?",
-            (guild_id, user_id, action),
-        )
-        if not row:
-            return 0
-        last_ts = int(row["last_used_ts"])
-        return max(0, cooldown_seconds - (int(time.time()) - last_ts))
+    async def _check_and_touch_cooldown(self, guild_id: int, user_id: int, action: str, cooldown_seconds: int) -> int:
+        """Return seconds left on the action's cooldown; 0 means allowed and the cooldown was restarted.
 
-    async def _touch_help_cooldown(self, guild_id: int, user_id: int, action: str) -> None:
-        await self.bot.db.execute(
+        One conditional upsert: a row comes back only when it was inserted or when the
+        cooldown had elapsed and last_used_ts moved forward. No row means on cooldown,
+        so two clicks in the same second can't both pass.
+        """
+        now = int(time.time())
+        row = await self.bot.db.execute_returning(
             "INSERT INTO help_cooldowns(guild_id,user_id,action,last_used_ts) VALUES(?,?,?,?) "
-            "ON CONFLICT(guild_id,user_id,action) DO UPDATE SET last_used_ts=excluded.last_used_ts",
-            (guild_id, user_id, action, int(time.time())),
+            "ON CONFLICT(guild_id,user_id,action) DO UPDATE SET last_used_ts=excluded.last_used_ts "
+            "WHERE excluded.last_used_ts-help_cooldowns.last_used_ts>=? "
+            "RETURNING last_used_ts",
+            (guild_id, user_id, action, now, cooldown_seconds),
+        )
+        if row:
+            return 0
+        # on cooldown: read the stored timestamp for the remaining time (rejected path only)
+        cur = await self.bot.db.fetchone(
+            "SELECT last_used_ts FROM help_cooldowns WHERE guild_id=? AND user_id=? AND action=?",
+            (guild_id, user_id, action),
         )
+        if not cur:
+            return cooldown_seconds
+        return max(1, cooldown_seconds - (now - int(cur["last_used_ts"])))
 
     # -----------------------------
     # Menu handler (DM only)
     # -----------------------------
     async def handle_help_selection(self, interaction: discord.Interaction, value: str):
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
+        allowed_guild_id = self._allowed_guild_id
         guild = self.bot.get_guild(allowed_guild_id) if allowed_guild_id else None
         if guild is None:
             return await interaction.response.send_message("Guild not found.")
@@ -172,149 +421,122 @@ class HelpCog(commands.Cog):
         if value == "weekly_status":
             return await self._send_weekly_status(interaction, guild)
 
-        # Cooldowns
-        cds = {
-            "appeal": 48 * 3600,
-            "report_user": 24 * 3600,
-            "bot_issue": 6 * 3600,
-            "transcript": 8 * 3600,
-        }
-
-        if value == "appeal":
-            remaining = await self._remaining_help_cooldown(guild.id, interaction.user.id, "appeal", cds["appeal"])
-            if remaining:
-                embed = discord.Embed(
-                    title="On cooldown",
-                    description=f"You're on cooldown for **Appeal punishment**.\nTry again in **{_format_duration(remaining)}**.",
-                )
-                return await interaction.response.send_message(embed=embed)
-
-            await self._touch_help_cooldown(guild.id, interaction.user.id, "appeal")
-            await self._start_help_session(interaction.user.id, guild.id, "appeal_punishment", {})
-            embed = discord.Embed(
-                title="Appeal punishment",
-                description="You can appeal either by our [google form](https://forms.gle/1fgqKtyo6okiQzjBA) or directly here.\n\nIf you chose the **first one**, click the link above and type **cancel**. If you chose the second one, please **state the reason for you punishment and what happened.**",
-            )
-            return await interaction.response.send_message(embed=embed)
-
-        if value == "report":
-            remaining = await self._remaining_help_cooldown(guild.id, interaction.user.id, "report_user", cds["report_user"])
-            if remaining:
-                embed = discord.Embed(
-                    title="On cooldown",
-                    description=f"You're on cooldown for **Report a user/message**.\nTry again in **{_format_duration(remaining)}**.",
-                )
-                return await interaction.response.send_message(embed=embed)
-
-            await self._touch_help_cooldown(guild.id, interaction.user.id, "report_user")
-            warning = bool(cfg.get("help", "report_warning_enabled", default=True))
-            text = "Please send the message link (preferred) OR user ID along with the reason for your report with evidence.\n\nType **cancel** to stop."
-            if warning:
-                text = "⚠️ False reports will lead to punishment.\n\n" + text
-
-            await self._start_help_session(interaction.user.id, guild.id, "report_details", {})
-            embed = discord.Embed(title="Report a user", description=text)
-            return await interaction.response.send_message(embed=embed)
-
-        if value == "bot_issue":
-            remaining = await self._remaining_help_cooldown(guild.id, interaction.user.id, "bot_issue", cds["bot_issue"])
-            if remaining:
-                embed = discord.Embed(
-                    title="On cooldown",
-                    description=f"You're on cooldown for **Report a bot issue**.\nTry again in **{_format_duration(remaining)}**.",
-                )
-                return await interaction.response.send_message(embed=embed)
+        action = HELP_ACTIONS.get(value)
+        if action is not None:
+            return await self._start_help_action(interaction, guild, action)
 
-            await self._touch_help_cooldown(guild.id, interaction.user.id, "bot_issue")
-            await self._start_help_session(interaction.user.id, guild.id, "bot_issue_details", {})
-            embed = discord.Embed(
-                title="Report a bot issue",
-                description="Please describe the bot issue/bug, and include screenshots or steps to reproduce/explanation in a single message.\n\nType **cancel** to stop.",
+        if value == "mod_contact":
+            return await interaction.response.send_message(
+                "Do you want to contact staff? Please only use this if you **need staff**.",
+                view=self._mod_confirm_view,
             )
-            return await interaction.response.send_message(embed=embed)
 
-        if value == "transcript":
-            remaining = await self._remaining_help_cooldown(guild.id, interaction.user.id, "transcript", cds["transcript"])
-            if remaining:
-                embed = discord.Embed(
-                    title="On cooldown",
-                    description=f"You're on cooldown for **Request transcript**.\nTry again in **{_format_duration(remaining)}**.",
-                )
-                return await interaction.response.send_message(embed=embed)
+        return await interaction.response.send_message("That option isn't available yet.")
 
-            await self._touch_help_cooldown(guild.id, interaction.user.id, "transcript")
-            await self._start_help_session(interaction.user.id, guild.id, "transcript_ticket", {})
+    async def _start_help_action(self, interaction: discord.Interaction, guild: discord.Guild, action: HelpAction):
+        """Cooldown-gated menu option: start its help session and send its prompt."""
+        remaining = await self._check_and_touch_cooldown(
+            guild.id, interaction.user.id, action.cooldown_key, HELP_COOLDOWNS[action.cooldown_key]
+        )
+        if remaining:
             embed = discord.Embed(
-                title="Request transcript",
-                description="Send your **ticket channel** (mention like <#123> or ID), or your **Ticket ID** (example: `T21`).\n\nType **cancel** to stop.",
+                title="On cooldown",
+                description=f"You're on cooldown for **{action.label}**.\nTry again in **{_format_duration(remaining)}**.",
             )
             return await interaction.response.send_message(embed=embed)
 
-        if value == "mod_contact":
-            return await interaction.response.send_message(
-                "Do you want to contact staff? Please only use this if you **need staff**.",
-                view=HelpModConfirmView(),
-            )
+        text = action.description
+        if action.warn_false_reports and self._report_warning_enabled:
+            text = "⚠️ False reports will lead to punishment.\n\n" + text
 
-        return await interaction.response.send_message("That option isn't available yet.")
+        await self._start_help_session(interaction.user.id, guild.id, action.stage, {})
+        embed = discord.Embed(title=action.title, description=text)
+        return await interaction.response.send_message(embed=embed)
 
-    async def _send_faq(self, interaction: discord.Interaction):
-        cfg = self.bot.config
-        faq = cfg.get("help", "faq", default={}) or {}
+    def _build_faq_embed(self) -> discord.Embed:
+        faq = self.bot.config.get("help", "faq", default={}) or {}
         title = str(faq.get("title", "FAQ") or "FAQ")
         entries = faq.get("entries", [])
         if not isinstance(entries, list):
             entries = []
         desc = "\n".join([f"• {str(x)}" for x in entries][:20]) or "Not available right now, sorry"
-        embed = discord.Embed(title=title, description=desc)
-        await interaction.response.send_message(embed=embed)
+        return discord.Embed(title=title, description=desc)
+
+    async def _send_faq(self, interaction: discord.Interaction):
+        # built on config (re)load; the same Embed is serialised for each send
+        await interaction.response.send_message(embed=self._faq_embed)
 
     async def _send_weekly_status(self, interaction: discord.Interaction, guild: discord.Guild):
-        cfg = self.bot.config
-        excluded_role_id = cfg.get_int("roles", "excluded_tracking_role_id")
+        excluded_role_id = self._excluded_role_id
         member = guild.get_member(interaction.user.id)
         if member is None:
             return await interaction.response.send_message("You must be in the server...")
 
-        if excluded_role_id and any(r.id == excluded_role_id for r in member.roles):
+        if excluded_role_id and member.get_role(excluded_role_id) is not None:
             return await interaction.response.send_message("You are excluded from weekly tracking.")
 
         ws = week_start_sunday(now_madrid()).isoformat()
+        # count and exact rank in one query (served by idx_activity_week_top)
         row = await self.bot.db.fetchone(
-            "SELECT count FROM activity_counts WHERE guild_id=? AND user_id=? AND week_start=?",
-            (guild.id, member.id, ws),
+            "SELECT count, rnk FROM ("
+            "SELECT user_id, count, RANK() OVER (ORDER BY count DESC) AS rnk "
+            "FROM activity_counts WHERE guild_id=? AND week_start=?"
+            ") WHERE user_id=?",
+            (guild.id, ws, member.id),
         )
         count = int(row["count"]) if row else 0
-
-        rows = await self.bot.db.fetchall(
-            "SELECT user_id, count FROM activity_counts WHERE guild_id=? AND week_start=? ORDER BY count DESC LIMIT 20",
-            (guild.id, ws),
-        )
-        rank = None
-        for i, r in enumerate(rows, start=1):
-            if int(r["user_id"]) == member.id:
-                rank = i
-                break
+        rank = int(row["rnk"]) if row else None
 
         embed = discord.Embed(title="Weekly status")
         embed.add_field(name="Messages counted", value=str(count), inline=True)
-        embed.add_field(name="Top 20 rank", value=(f"#{rank}" if rank else "Not in top 20"), inline=True)
+        embed.add_field(name="Rank", value=(f"#{rank}" if rank else "Not ranked yet"), inline=True)
         await interaction.response.send_message(embed=embed)
 
     # -----------------------------
     # Help sessions
     # -----------------------------
+    async def _load_help_sessions(self) -> None:
+        try:
+            rows = await self.bot.db.fetchall("SELECT guild_id, user_id, stage, data_json FROM help_sessions")
+        except Exception:
+            return
+        self._sessions.clear()
+        self._sessions_complete = True
+        for r in rows:
+            try:
+                data = _loads_session(r["data_json"])
+            except Exception:
+                data = {}
+            self._cache_help_session((int(r["guild_id"]), int(r["user_id"])), str(r["stage"]), data)
+
+    def _cache_help_session(self, key: Tuple[int, int], stage: str, data: Dict[str, Any]) -> None:
+        self._sessions[key] = {"stage": stage, "data": data}
+        self._sessions.move_to_end(key)
+        if len(self._sessions) > HELP_SESSION_CACHE_MAX:
+            self._sessions.popitem(last=False)
+            self._sessions_complete = False  # evicted sessions are only in SQLite now
+
     async def _start_help_session(self, user_id: int, guild_id: int, stage: str, data: Dict[str, Any]):
         await self.bot.db.execute(
             "INSERT INTO help_sessions(guild_id,user_id,stage,created_ts,data_json) VALUES(?,?,?,?,?) "
             "ON CONFLICT(guild_id,user_id) DO UPDATE SET stage=excluded.stage, created_ts=excluded.created_ts, data_json=excluded.data_json",
-            (guild_id, user_id, stage, int(time.time()), json.dumps(data)),
+            (guild_id, user_id, stage, int(time.time()), jsonutil.dumps(data)),
         )
+        self._cache_help_session((guild_id, user_id), stage, data)
 
     async def _clear_help_session(self, user_id: int, guild_id: int):
         await self.bot.db.execute("DELETE FROM help_sessions WHERE guild_id=? AND user_id=?", (guild_id, user_id))
+        self._sessions.pop((guild_id, user_id), None)
 
     async def _get_help_session(self, user_id: int, guild_id: int) -> Optional[Dict[str, Any]]:
+        key = (guild_id, user_id)
+        sess = self._sessions.get(key)
+        if sess is not None:
+            self._sessions.move_to_end(key)
+            return {"stage": sess["stage"], "data": dict(sess["data"])}
+        if self._sessions_complete:
+            return None
+
         row = await self.bot.db.fetchone(
             "SELECT stage, data_json FROM help_sessions WHERE guild_id=? AND user_id=?",
             (guild_id, user_id),
@@ -322,10 +544,11 @@ class HelpCog(commands.Cog):
         if not row:
             return None
         try:
-            data = json.loads(row["data_json"] or "{}")
+            data = _loads_session(row["data_json"])
         except Exception:
             data = {}
-        return {"stage": str(row["stage"]), "data": data}
+        self._cache_help_session(key, str(row["stage"]), data)
+        return {"stage": str(row["stage"]), "data": dict(data)}
 
     async def _handle_help_session_message(self, guild: discord.Guild, message: discord.Message) -> bool:
         sess = await self._get_help_session(message.author.id, guild.id)
@@ -416,15 +639,22 @@ class HelpCog(commands.Cog):
 
     def _parse_ticket_reference(self, text: str) -> Tuple[Optional[int], Optional[int]]:
         """Return (channel_id, ticket_id). Only one will be non-None."""
-        m = re.search(r"<#(\d{15,25})>", text)
+        text = text.strip()
+        m = _CHANNEL_MENTION_RE.search(text)
         if m:
             return int(m.group(1)), None
 
-        m = re.search(r"\bT?(\d{1,25})\b", text.strip(), flags=re.I)
-        if not m:
-            return None, None
+        # common case: the whole reply is just "123" / "T123", no regex needed
+        digits = text[1:] if text[:1] in ("T", "t") else text
+        if digits.isascii() and digits.isdigit():
+            if len(digits) > 25:
+                return None, None
+        else:
+            m = _TICKET_REF_RE.search(text)
+            if not m:
+                return None, None
+            digits = m.group(1)
 
-        digits = m.group(1)
         if len(digits) >= 15:
             return int(digits), None
         return None, int(digits)
@@ -433,8 +663,7 @@ class HelpCog(commands.Cog):
     # Staff submissions
     # -----------------------------
     async def _submit_appeal(self, guild: discord.Guild, user_id: int, data: Dict[str, Any]):
-        cfg = self.bot.config
-        ch_id = cfg.get_int("channels", "appeals_log_channel_id")
+        ch_id = self._appeals_ch_id
         channel = guild.get_channel(ch_id) if ch_id else None
         if not isinstance(channel, discord.TextChannel):
             return
@@ -445,8 +674,7 @@ class HelpCog(commands.Cog):
         await channel.send(embed=embed)
 
     async def _submit_report(self, guild: discord.Guild, user_id: int, data: Dict[str, Any]):
-        cfg = self.bot.config
-        ch_id = cfg.get_int("channels", "reports_log_channel_id")
+        ch_id = self._reports_ch_id
         channel = guild.get_channel(ch_id) if ch_id else None
         if not isinstance(channel, discord.TextChannel):
             return
@@ -456,8 +684,7 @@ class HelpCog(commands.Cog):
         await channel.send(embed=embed)
 
     async def _submit_bot_issue(self, guild: discord.Guild, user_id: int, data: Dict[str, Any]):
-        cfg = self.bot.config
-        ch_id = cfg.get_int("channels", "bot_issues_log_channel_id")
+        ch_id = self._bot_issues_ch_id
         channel = guild.get_channel(ch_id) if ch_id else None
         if not isinstance(channel, discord.TextChannel):
             return
@@ -470,12 +697,23 @@ class HelpCog(commands.Cog):
     # Transcript requests (staff approval)
     # -----------------------------
     async def _create_transcript_request(self, guild: discord.Guild, requester_id: int, ticket_channel_id: int, ticket_id: Optional[int]) -> Tuple[bool, str]:
-        cfg = self.bot.config
-        req_ch_id = cfg.get_int("channels", "transcript_requests_channel_id")
+        req_ch_id = self._transcript_req_ch_id
         channel = guild.get_channel(req_ch_id) if req_ch_id else None
         if not isinstance(channel, discord.TextChannel):
             return False, "Transcript requests channel is not configured, DM Average Hollow Knight Fan."
 
+        # Claim the ticket before the first await so two concurrent requests can't both pass
+        # the duplicate check and each post a staff message.
+        key = (guild.id, "ticket", ticket_id) if ticket_id is not None else (guild.id, "channel", ticket_channel_id)
+        if key in self._transcript_inflight:
+            return False, "There is already a **pending** transcript request for that ticket."
+        self._transcript_inflight.add(key)
+        try:
+            return await self._post_transcript_request(channel, guild, requester_id, ticket_channel_id, ticket_id)
+        finally:
+            self._transcript_inflight.discard(key)
+
+    async def _post_transcript_request(self, channel: discord.TextChannel, guild: discord.Guild, requester_id: int, ticket_channel_id: int, ticket_id: Optional[int]) -> Tuple[bool, str]:
         if ticket_id is not None:
             existing = await self.bot.db.fetchone(
                 "SELECT status FROM transcript_requests WHERE guild_id=? AND ticket_id=? ORDER BY created_ts DESC LIMIT 1",
@@ -501,7 +739,7 @@ class HelpCog(commands.Cog):
             embed.add_field(name="Ticket ID", value=f"T{ticket_id}", inline=False)
         embed.set_footer(text="Staff: Approve or Deny")
 
-        msg = await channel.send(embed=embed, view=TranscriptRequestView())
+        msg = await channel.send(embed=embed, view=self._transcript_request_view)
 
         await self.bot.db.execute(
             "INSERT INTO transcript_requests(guild_id, request_message_id, ticket_channel_id, requester_id, status, created_ts, ticket_id) "
@@ -511,12 +749,10 @@ class HelpCog(commands.Cog):
         return True, ""
 
     async def handle_transcript_request_decision(self, interaction: discord.Interaction, approved: bool):
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        if interaction.guild is None or interaction.guild.id != allowed_guild_id:
+        if interaction.guild is None or interaction.guild.id != self._allowed_guild_id:
             return await interaction.response.send_message("Wrong server.", ephemeral=True)
 
-        mod_role_id = cfg.get_int("roles", "MOD_ROLE_ID") or 0
+        mod_role_id = self._mod_role_id
         member = interaction.guild.get_member(interaction.user.id)
         if member is None or not is_mod(member, mod_role_id):
             return await interaction.response.send_message("Only mods can do that.", ephemeral=True)
@@ -535,29 +771,31 @@ class HelpCog(commands.Cog):
         requester_id = int(row["requester_id"])
         ticket_id = int(row["ticket_id"]) if row["ticket_id"] is not None else None
 
+        # The status write and the Discord calls below don't depend on each other, so they
+        # run concurrently; Discord failures are ignored (return_exceptions), DB errors still raise.
         if not approved:
-            await self.bot.db.execute("UPDATE transcript_requests SET status='denied' WHERE request_message_id=?", (interaction.message.id,))
-            try:
-                await interaction.message.edit(content="❌ Denied", view=None)
-            except Exception:
-                pass
-            try:
-                await interaction.response.send_message("Denied.", ephemeral=True)
-            except Exception:
-                pass
-            try:
-                user = await self.bot.fetch_user(requester_id)
+            async def _notify_requester():
+                user = await self._resolve_user(interaction.guild, requester_id)
                 await user.send(f"Your transcript request was **denied** by staff. (Ticket {('T'+str(ticket_id)) if ticket_id else ticket_channel_id})")
-            except Exception:
-                pass
-            return
 
-        await self.bot.db.execute("UPDATE transcript_requests SET status='approved' WHERE request_message_id=?", (interaction.message.id,))
+            await asyncio.gather(
+                self.bot.db.execute("UPDATE transcript_requests SET status='denied' WHERE request_message_id=?", (interaction.message.id,)),
+                asyncio.gather(
+                    interaction.message.edit(content="❌ Denied", view=None),
+                    interaction.response.send_message("Denied.", ephemeral=True),
+                    _notify_requester(),
+                    return_exceptions=True,
+                ),
+            )
+            return
 
-        try:
-            await interaction.response.send_message("Approved. Sending transcript…", ephemeral=True)
-        except Exception:
-            pass
+        await asyncio.gather(
+            self.bot.db.execute("UPDATE transcript_requests SET status='approved' WHERE request_message_id=?", (interaction.message.id,)),
+            asyncio.gather(
+                interaction.response.send_message("Approved. Sending transcript…", ephemeral=True),
+                return_exceptions=True,
+            ),
+        )
 
         ok = await self._dm_transcript(interaction.guild, requester_id, ticket_channel_id, ticket_id)
 
@@ -566,10 +804,16 @@ class HelpCog(commands.Cog):
         except Exception:
             pass
 
+    async def _resolve_user(self, guild: discord.Guild, user_id: int) -> discord.abc.Messageable:
+        """Member/User to DM from the cache, falling back to a REST fetch_user only on a miss."""
+        user = guild.get_member(user_id) or self.bot.get_user(user_id)
+        if user is None:
+            user = await self.bot.fetch_user(user_id)
+        return user
+
     async def _dm_transcript(self, guild: discord.Guild, requester_id: int, ticket_channel_id: int, ticket_id: Optional[int]) -> bool:
-        user: Optional[discord.User]
         try:
-            user = await self.bot.fetch_user(requester_id)
+            user = await self._resolve_user(guild, requester_id)
         except Exception:
             return False
 
@@ -619,8 +863,7 @@ class HelpCog(commands.Cog):
     # Ticket creation (mod contact)
     # -----------------------------
     async def handle_mod_confirm(self, interaction: discord.Interaction, confirmed: bool):
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
+        allowed_guild_id = self._allowed_guild_id
         guild = self.bot.get_guild(allowed_guild_id) if allowed_guild_id else None
         if guild is None:
             return await interaction.response.send_message("Guild not found.", ephemeral=True)
@@ -632,7 +875,7 @@ class HelpCog(commands.Cog):
         if not confirmed:
             return await interaction.response.send_message("Cancelled.", ephemeral=True)
 
-        cooldown_h = int(cfg.get("tickets", "ticket_creation_cooldown_hours", default=24) or 24)
+        cooldown_h = self._ticket_cooldown_h
         row = await self.bot.db.fetchone(
             "SELECT last_created_ts FROM ticket_cooldowns WHERE guild_id=? AND user_id=?",
             (guild.id, member.id),
@@ -645,8 +888,8 @@ class HelpCog(commands.Cog):
                 ephemeral=True,
             )
 
-        category_id = cfg.get_int("tickets", "ticket_category_id")
-        mod_role_id = cfg.get_int("roles", "MOD_ROLE_ID")
+        category_id = self._ticket_category_id
+        mod_role_id = self._mod_role_id
         if not category_id or not mod_role_id:
             return await interaction.response.send_message("Ticket system is not configured (Average's fault, please contact him)", ephemeral=True)
 
@@ -654,13 +897,7 @@ class HelpCog(commands.Cog):
         if not isinstance(category, discord.CategoryChannel):
             return await interaction.response.send_message("Ticket category is missing or invalid ((Average's fault, please contact him)", ephemeral=True)
 
-        mod_role = guild.get_role(mod_role_id)
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            member: discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True),
-        }
-        if mod_role:
-            overwrites[mod_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
+        overwrites = self._ticket_overwrites(guild, member, mod_role_id)
 
         ticket_id = await self._next_ticket_id(guild.id)
         name = f"ticket-{ticket_id}-{member.name}".lower().replace(" ", "-")[:90]
@@ -670,70 +907,77 @@ class HelpCog(commands.Cog):
         except Exception:
             return await interaction.response.send_message("Failed to create ticket (missing permissions?)", ephemeral=True)
 
-        await self.bot.db.execute(
-            "INSERT OR REPLACE INTO ticket_cooldowns(guild_id, user_id, last_created_ts) VALUES(?,?,?)",
-            (guild.id, member.id, now),
-        )
-        await self.bot.db.execute(
-            "INSERT OR REPLACE INTO tickets(guild_id, channel_id, creator_id, created_ts, last_user_activity_ts, status, ticket_id) "
-            "VALUES(?,?,?,?,?, 'open', ?)",
-            (guild.id, channel.id, member.id, now, now, ticket_id),
+        # cooldown + ticket row in one transaction (one commit)
+        await self.bot.db.executebatch([
+            (
+                "INSERT OR REPLACE INTO ticket_cooldowns(guild_id, user_id, last_created_ts) VALUES(?,?,?)",
+                (guild.id, member.id, now),
+            ),
+            (
+                "INSERT OR REPLACE INTO tickets(guild_id, channel_id, creator_id, created_ts, last_user_activity_ts, status, ticket_id) "
+                "VALUES(?,?,?,?,?, 'open', ?)",
+                (guild.id, channel.id, member.id, now, now, ticket_id),
+            ),
+        ])
+        self.register_ticket(channel.id)
+
+        # The three notifications are independent round trips; failures are ignored as before.
+        await asyncio.gather(
+            self._send_ticket_created_dm(member, channel, ticket_id),
+            interaction.response.send_message(f"Ticket created: {channel.mention}", ephemeral=True),
+            channel.send(f"Please say what you need {member.mention}, {pinged_role_for_tickets if pinged_role_for_tickets else 'staff'} will be shortly with you ;)"),
+            return_exceptions=True,
         )
 
+    def _ticket_overwrites(self, guild: discord.Guild, member: discord.Member, mod_role_id: int) -> Dict[Any, discord.PermissionOverwrite]:
+        # The everyone/mod entries are the same for every ticket; build them once per
+        # config load (not cached while the mod role can't be resolved) and add the creator.
+        proto = self._overwrites_proto.get(guild.id)
+        if proto is None:
+            proto = {guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+            mod_role = guild.get_role(mod_role_id)
+            if mod_role:
+                proto[mod_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
+                self._overwrites_proto[guild.id] = proto
+        overwrites = dict(proto)
+        overwrites[member] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
+        return overwrites
+
+    async def _send_ticket_created_dm(self, member: discord.Member, channel: discord.TextChannel, ticket_id: int) -> None:
         # DM includes Ticket ID
-        try:
-            dm = await member.create_dm()
-            embed = discord.Embed(
-                title="Ticket created",
-                description=f"Your ticket has been created -> {channel.mention}\n\nTicket ID: `T{ticket_id}`",
-            )
-            await dm.send(embed=embed)
-        except Exception:
-            pass
-
-        try:
-            await interaction.response.send_message(f"Ticket created: {channel.mention}", ephemeral=True)
-        except Exception:
-            pass
-
-        try:
-            await channel.send(f"Please say what you need {member.mention}, {pinged_role_for_tickets if pinged_role_for_tickets else 'staff'} will be shortly with you ;)")
-        except Exception:
-            pass
+        embed = discord.Embed(
+            title="Ticket created",
+            description=f"Your ticket has been created -> {channel.mention}\n\nTicket ID: `T{ticket_id}`",
+        )
+        await member.send(embed=embed)
 
     async def _next_ticket_id(self, guild_id: int) -> int:
-        row = await self.bot.db.fetchone("SELECT next_ticket_id FROM ticket_sequences WHERE guild_id=?", (guild_id,))
-        if not row:
-            await self.bot.db.execute("INSERT INTO ticket_sequences(guild_id, next_ticket_id) VALUES(?, ?)", (guild_id, 2))
-            return 1
-
-        next_id = int(row["next_ticket_id"])
-        await self.bot.db.execute("UPDATE ticket_sequences SET next_ticket_id=? WHERE guild_id=?", (next_id + 1, guild_id))
-        return next_id
+        return await self.bot.db.next_ticket_id(guild_id)
 
     async def handle_ticket_close_prompt(self, interaction: discord.Interaction, confirmed: bool):
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        if interaction.guild is None or interaction.guild.id != allowed_guild_id:
+        if interaction.guild is None or interaction.guild.id != self._allowed_guild_id:
             return await interaction.response.send_message("Wrong server.", ephemeral=True)
 
-        mod_role_id = cfg.get_int("roles", "MOD_ROLE_ID")
+        mod_role_id = self._mod_role_id
         if mod_role_id:
             member = interaction.guild.get_member(interaction.user.id)
             if member is None or not is_mod(member, mod_role_id):
                 return await interaction.response.send_message("Only staff can close tickets", ephemeral=True)
 
         if not confirmed:
-            await interaction.response.send_message("Keeping ticket open.", ephemeral=True)
-            await self.bot.db.execute("UPDATE tickets SET status='open' WHERE channel_id=?", (interaction.channel_id,))
+            # the reply and the status write are independent, so they overlap
+            await asyncio.gather(
+                interaction.response.send_message("Keeping ticket open.", ephemeral=True),
+                self.bot.db.execute("UPDATE tickets SET status='open' WHERE channel_id=?", (interaction.channel_id,)),
+            )
+            self.register_ticket(interaction.channel_id)
             return
 
         await interaction.response.send_message("Closing ticket...", ephemeral=True)
         await self.close_ticket_channel(interaction.guild, interaction.channel_id)
 
     async def close_ticket_channel(self, guild: discord.Guild, channel_id: int):
-        cfg = self.bot.config
-        log_channel_id = cfg.get_int("channels", "general_logging_channel_id")
+        log_channel_id = self._log_channel_id
         log_channel = guild.get_channel(log_channel_id) if log_channel_id else None
         channel = guild.get_channel(channel_id)
 
@@ -743,6 +987,8 @@ class HelpCog(commands.Cog):
         row = await self.bot.db.fetchone("SELECT ticket_id FROM tickets WHERE channel_id=?", (channel_id,))
         ticket_id = int(row["ticket_id"]) if row and row["ticket_id"] is not None else None
 
+        # transcript pointer (if any) and the status change are committed together
+        writes = []
         try:
             transcript_path = await build_text_transcript(channel)
             if isinstance(log_channel, discord.TextChannel):
@@ -751,18 +997,25 @@ class HelpCog(commands.Cog):
                     file=discord.File(transcript_path, filename=f"transcript-{ticket_id or channel.id}.txt"),
                 )
                 if ticket_id is not None:
-                    await self.bot.db.execute(
+                    writes.append((
                         "INSERT OR REPLACE INTO ticket_transcripts(guild_id, ticket_id, log_channel_id, log_message_id, created_ts) "
                         "VALUES(?,?,?,?,?)",
                         (guild.id, ticket_id, sent.channel.id, sent.id, int(time.time())),
-                    )
+                    ))
         except Exception:
             pass
 
+        close_stmt = ("UPDATE tickets SET status='closed' WHERE channel_id=?", (channel_id,))
+        writes.append(close_stmt)
         try:
-            await self.bot.db.execute("UPDATE tickets SET status='closed' WHERE channel_id=?", (channel_id,))
+            await self.bot.db.executebatch(writes)
         except Exception:
-            pass
+            # the batch rolled back; still mark the ticket closed on its own
+            try:
+                await self.bot.db.execute(*close_stmt)
+            except Exception:
+                pass
+        self.unregister_ticket(channel_id)
 
         try:
             await channel.delete(reason="Ticket closed")
@@ -1,23 +1,43 @@
 from __future__ import annotations
 
 import json
+import re
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 import discord
 from discord.ext import commands
 
-from utils.checks import ensure_allowed_guild_id, basic_color
+from utils.checks import basic_color
+
+# Drop expired per-user cooldown entries once the dict grows past this size
+_COOLDOWN_PRUNE_AT = 4096
 
 class MessageResponsesCog(commands.Cog):
     def __init__(self, bot: discord.Bot):
         self.bot = bot
         self._rules: List[Dict[str, Any]] = []
+        # Precompiled from _rules by _compile_rules():
+        # (casefolded trigger, whole-message?, channel ids or None, reply?, prebuilt embed or None, text or None)
+        self._compiled: List[Tuple[str, bool, Optional[FrozenSet[int]], bool, Optional[discord.Embed], Optional[str]]] = []
+        self._whole_triggers: FrozenSet[str] = frozenset()
+        self._substring_re: Optional[re.Pattern] = None
+        # user_id -> time.monotonic() of the last checked message; pruned past _COOLDOWN_PRUNE_AT entries
         self._cooldown: Dict[int, float] = {}
+        self._refresh_config_cache()
         self.load_rules()
 
+    def _refresh_config_cache(self) -> None:
+        cfg = self.bot.config
+        self._allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
+        self._cooldown_seconds = int(cfg.get("responses", "cooldown_seconds", default=15) or 15)
+
     def load_rules(self) -> None:
+        self._read_rules()
+        self._compile_rules()
+
+    def _read_rules(self) -> None:
         cfg = self.bot.config
         path = cfg.get_str("responses", "rules_path", default="responses.json")
         p = Path(path)
@@ -34,18 +54,54 @@ class MessageResponsesCog(commands.Cog):
         except Exception:
             self._rules = []
 
+    def _compile_rules(self) -> None:
+        """Normalise triggers/channel filters, prebuild replies and build the per-message prefilter."""
+        compiled = []
+        for rule in self._rules:
+            trigger = str(rule.get("Content", "")).strip().casefold()
+            if not trigger:
+                continue
+            chans = rule.get("Channels", [])
+            chan_ids: Optional[FrozenSet[int]] = None
+            if isinstance(chans, list) and chans:
+                try:
+                    chan_ids = frozenset(int(x) for x in chans) or None
+                except Exception:
+                    chan_ids = None
+
+            embed: Optional[discord.Embed] = None
+            text: Optional[str] = None
+            if bool(rule.get("Embed", False)):
+                et = rule.get("Embed_text", {}) or {}
+                title = str(et.get("title", "") or "")
+                desc = str(et.get("description", "") or "")
+                color = basic_color(str(et.get("color", "") or ""))
+                embed = discord.Embed(title=title or None, description=desc or None, color=color)
+            elif bool(rule.get("Message", False)):
+                text = str(rule.get("Message_text", "") or "")
+
+            compiled.append((trigger, bool(rule.get("Whole_message", False)), chan_ids,
+                             bool(rule.get("Respond", False)), embed, text))
+
+        self._compiled = compiled
+        self._whole_triggers = frozenset(c[0] for c in compiled if c[1])
+        subs = sorted({c[0] for c in compiled if not c[1]}, key=len, reverse=True)
+        self._substring_re = re.compile("|".join(map(re.escape, subs))) if subs else None
+
     def on_config_reload(self) -> None:
+        self._refresh_config_cache()
         self.load_rules()
         self._cooldown.clear()
 
     def _cooldown_ok(self, user_id: int) -> bool:
-        cfg = self.bot.config
-        cd = int(cfg.get("responses", "cooldown_seconds", default=15) or 15)
-        now = time.time()
-        last = self._cooldown.get(user_id, 0.0)
-        if now - last < cd:
+        cd = self._cooldown_seconds
+        now = time.monotonic()
+        last = self._cooldown.get(user_id)
+        if last is not None and now - last < cd:
             return False
         self._cooldown[user_id] = now
+        if len(self._cooldown) > _COOLDOWN_PRUNE_AT:
+            self._cooldown = {uid: ts for uid, ts in self._cooldown.items() if now - ts < cd}
         return True
 
     @commands.Cog.listener()
@@ -53,9 +109,7 @@ class MessageResponsesCog(commands.Cog):
         if message.author.bot or message.guild is None:
             return
 
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(message.guild, allowed_guild_id):
+        if message.guild.id != self._allowed_guild_id:
             return
 
         if not self._rules:
@@ -65,46 +119,32 @@ class MessageResponsesCog(commands.Cog):
             return
 
         content = (message.content or "").strip()
-        lowered = content.casefold()
+        # lower() equals casefold() on ASCII and is cheaper; triggers are casefolded at load
+        lowered = content.lower() if content.isascii() else content.casefold()
 
-        for rule in self._rules:
-            try:
-                trigger = str(rule.get("Content", "")).strip()
-                if not trigger:
-                    continue
-                whole = bool(rule.get("Whole_message", False))
-                trigger_l = trigger.strip().casefold()
+        # one set lookup + one regex scan decide whether any rule can match at all
+        if lowered not in self._whole_triggers and (
+            self._substring_re is None or self._substring_re.search(lowered) is None
+        ):
+            return
 
+        for trigger_l, whole, chan_ids, respond, embed, text in self._compiled:
+            try:
                 match = (lowered == trigger_l) if whole else (trigger_l in lowered)
                 if not match:
                     continue
 
                 # channel filter
-                chans = rule.get("Channels", [])
-                if isinstance(chans, list) and chans:
-                    try:
-                        chan_ids = {int(x) for x in chans}
-                    except Exception:
-                        chan_ids = set()
-                    if chan_ids and message.channel.id not in chan_ids:
-                        continue
-
-                respond = bool(rule.get("Respond", False))
-                use_embed = bool(rule.get("Embed", False))
-                use_msg = bool(rule.get("Message", False))
-
-                if use_embed:
-                    et = rule.get("Embed_text", {}) or {}
-                    title = str(et.get("title", "") or "")
-                    desc = str(et.get("description", "") or "")
-                    color = basic_color(str(et.get("color", "") or ""))
-                    embed = discord.Embed(title=title or None, description=desc or None, color=color)
+                if chan_ids is not None and message.channel.id not in chan_ids:
+                    continue
+
+                # embeds are built once per reload and never mutated, so they are shared across sends
+                if embed is not None:
                     if respond:
                         await message.reply(embed=embed, mention_author=False)
                     else:
                         await message.channel.send(embed=embed)
-                elif use_msg:
-                    text = str(rule.get("Message_text", "") or "")
+                elif text is not None:
                     if respond:
                         await message.reply(text, mention_author=False)
                     else:
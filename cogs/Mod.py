@@ -1,37 +1,72 @@
 from __future__ import annotations
 
+from typing import List, Tuple
+
 import discord
 from discord.ext import commands
 
-from utils.checks import ensure_allowed_guild_id, member_has_any_role
+from utils.checks import member_has_any_role
 
 class ModCog(commands.Cog):
     def __init__(self, bot: discord.Bot):
         self.bot = bot
+        self._refresh_config_cache()
+
+    def _refresh_config_cache(self) -> None:
+        cfg = self.bot.config
+        self._allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
+        self._autodelete_channel_id = cfg.get_int("channels", "autodelete_channel_id")
+        self._restriction_role_id = cfg.get_int("roles", "restriction_role_ID")
+        self._whitelist_roles = frozenset(cfg.get_int_list("roles", "whitelisted_deletion_ID_roles"))
+
+        # DM-on-role supports one legacy role or multiple entries.
+        rules: List[Tuple[int, str]] = []
+        entries = cfg.get("autoDM", "entries", default=None)
+        if isinstance(entries, list):
+            for ent in entries:
+                if not isinstance(ent, dict):
+                    continue
+                rid = ent.get("role_id")
+                try:
+                    rid_int = int(rid)
+                except Exception:
+                    continue
+                msg = str(ent.get("message", "") or "")
+                if msg:
+                    rules.append((rid_int, msg))
+
+        legacy_role_id = cfg.get_int("roles", "autoDM_watched_role_id")
+        if legacy_role_id:
+            legacy_msg = cfg.get_str("autoDM", "message", default="Hello {user}!")
+            rules.append((legacy_role_id, legacy_msg))
+
+        self._dm_rules = rules
+        self._dm_role_ids = frozenset(rid for rid, _ in rules)
+
+    def on_config_reload(self) -> None:
+        self._refresh_config_cache()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot:
             return
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        if message.guild is None or not ensure_allowed_guild_id(message.guild, allowed_guild_id):
-            return
-
-        target_channel_id = cfg.get_int("channels", "autodelete_channel_id")
+        # cheapest rejections first: most messages are simply not in the autodelete channel
+        target_channel_id = self._autodelete_channel_id
         if target_channel_id and message.channel.id != target_channel_id:
             return
 
-        whitelist_roles = cfg.get_int_list("roles", "whitelisted_deletion_ID_roles")
-        restriction_role_id = cfg.get_int("roles", "restriction_role_ID")
+        restriction_role_id = self._restriction_role_id
         if not restriction_role_id:
             return
 
-        member = message.guild.get_member(message.author.id)
+        if message.guild is None or message.guild.id != self._allowed_guild_id:
+            return
+
+        member = message.author if isinstance(message.author, discord.Member) else message.guild.get_member(message.author.id)
         if member is None:
             return
 
-        if member_has_any_role(member, whitelist_roles):
+        if member_has_any_role(member, self._whitelist_roles):
             return
 
         # delete the message and apply restriction role
@@ -42,22 +77,18 @@ class ModCog(commands.Cog):
 
         try:
             role = message.guild.get_role(restriction_role_id)
-            if role and role not in member.roles:
+            if role and member.get_role(restriction_role_id) is None:
                 await member.add_roles(role, reason="Autodeletion restriction")
         except Exception:
             pass
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if payload.guild_id is None:
-            return
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        if payload.guild_id != allowed_guild_id:
+        target_channel_id = self._autodelete_channel_id
+        if target_channel_id and payload.channel_id != target_channel_id:
             return
 
-        target_channel_id = cfg.get_int("channels", "autodelete_channel_id")
-        if target_channel_id and payload.channel_id != target_channel_id:
+        if payload.guild_id is None or payload.guild_id != self._allowed_guild_id:
             return
 
         guild = self.bot.get_guild(payload.guild_id)
@@ -68,65 +99,49 @@ class ModCog(commands.Cog):
         if member is None or member.bot:
             return
 
-        whitelist_roles = cfg.get_int_list("roles", "whitelisted_deletion_ID_roles")
-        restriction_role_id = cfg.get_int("roles", "restriction_role_ID")
+        restriction_role_id = self._restriction_role_id
         if not restriction_role_id:
             return
 
-        if member_has_any_role(member, whitelist_roles):
+        if member_has_any_role(member, self._whitelist_roles):
             return
 
         # remove reaction and apply restriction role
         try:
             channel = guild.get_channel(payload.channel_id)
             if isinstance(channel, discord.TextChannel):
-                msg = await channel.fetch_message(payload.message_id)
-                await msg.remove_reaction(payload.emoji, member)
+                # a partial message is enough to remove a reaction; no fetch round trip
+                await channel.get_partial_message(payload.message_id).remove_reaction(payload.emoji, member)
         except Exception:
             pass
 
         try:
             role = guild.get_role(restriction_role_id)
-            if role and role not in member.roles:
+            if role and member.get_role(restriction_role_id) is None:
                 await member.add_roles(role, reason="Autodeletion reaction restriction")
         except Exception:
             pass
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        if after.guild.id != allowed_guild_id:
-            return        # DM-on-role supports one legacy role or multiple entries.
-        rules = []
-        entries = cfg.get("autoDM", "entries", default=None)
-        if isinstance(entries, list):
-            for ent in entries:
-                if not isinstance(ent, dict):
-                    continue
-                rid = ent.get("role_id")
-                try:
-                    rid_int = int(rid)
-                except Exception:
-                    continue
-                msg = str(ent.get("message", "") or "")
-                if msg:
-                    rules.append((rid_int, msg))
-
-        legacy_role_id = cfg.get_int("roles", "autoDM_watched_role_id")
-        if legacy_role_id:
-            legacy_msg = cfg.get_str("autoDM", "message", default="Hello {user}!")
-            rules.append((legacy_role_id, legacy_msg))
+        if after.guild.id != self._allowed_guild_id:
+            return
 
         # no rules configured
-        if not rules:
+        if not self._dm_rules:
             return
 
-        before_ids = {r.id for r in before.roles}
-        after_ids = {r.id for r in after.roles}
+        # most member updates (nick, timeout, avatar...) don't add a role;
+        # Member._roles is the raw id array, Member.roles would resolve and sort Role objects
+        added = set(after._roles).difference(before._roles)
+        if not added:
+            return
+        added &= self._dm_role_ids
+        if not added:
+            return
 
-        for role_id, msg_template in rules:
-            if role_id in after_ids and role_id not in before_ids:
+        for role_id, msg_template in self._dm_rules:
+            if role_id in added:
                 role = after.guild.get_role(role_id)
                 txt = str(msg_template).format(
                     user=after.mention,
@@ -1,38 +1,111 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Dict, Optional, Any, List
+import random
+import weakref
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Any, List, Tuple, Union
 
 import discord
 from discord.ext import commands
 
-from utils.checks import ensure_allowed_guild_id, basic_color
+from utils.checks import basic_color
+
+# Seconds from the first pending sticky_state change to its batched write
+STICKY_FLUSH_DELAY = 0.5
+
+# History depth for the bot-post check: threads created by this process within the narrow
+# window can only have the embed right after the starter post; anything older (pre-start,
+# or evicted from the checked set) gets the wider scan the check always used before
+FORUM_HISTORY_WIDE_LIMIT = 25
+FORUM_HISTORY_NARROW_WINDOW = 600
+
+# Send attempts for a forum first-message before giving up
+FORUM_SEND_ATTEMPTS = 6
+
+# Handled forum thread ids kept in memory; the oldest are forgotten first
+FORUM_THREAD_CACHE_MAX = 10_000
+
+
+def _remember_thread(cache: "OrderedDict[int, None]", thread_id: int) -> None:
+    cache[thread_id] = None
+    cache.move_to_end(thread_id)
+    if len(cache) > FORUM_THREAD_CACHE_MAX:
+        cache.popitem(last=False)
+
+
+def _normalize_templates(templates: Dict[str, Any]) -> Dict[Union[str, int], Dict[str, Any]]:
+    # Tag template keys come from JSON as strings; store them as ints so thread tags
+    # (tag.id) can be looked up directly. Non-dict templates are dropped here once.
+    out: Dict[Union[str, int], Dict[str, Any]] = {}
+    for k, v in templates.items():
+        if not isinstance(v, dict):
+            continue
+        if k == "default":
+            out[k] = v
+            continue
+        try:
+            out[int(k)] = v
+        except Exception:
+            continue
+    return out
 
 
 class StickyCog(commands.Cog):
     def __init__(self, bot: discord.Bot):
         self.bot = bot
-        self._debounce_tasks: Dict[int, asyncio.Task] = {}
+        # channel_id -> pending debounce timer; the sticky task is only created when it fires
+        self._debounce_handles: Dict[int, asyncio.TimerHandle] = {}
         self._sticky_entries: List[Dict[str, Any]] = []
-
-        # forum_channel_id -> templates dict (keys: "default" and tag_id strings)
-        self._forum_rules: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        # channel_id -> sticky entry, rebuilt from _sticky_entries on reload
+        self._sticky_by_channel: Dict[int, Dict[str, Any]] = {}
+        # (guild_id, channel_id) -> last sticky message id; mirrors sticky_state, which
+        # _sticky_flush_soon brings up to date from the dirty keys in batches
+        self._last_sticky_ids: Dict[Tuple[int, int], int] = {}
+        self._sticky_dirty: set[Tuple[int, int]] = set()
+        self._sticky_state_loaded = False
+        self._sticky_flush_task: Optional[asyncio.Task] = None
+
+        # forum_channel_id -> templates dict (keys: "default" and int tag ids, normalised at load)
+        self._forum_rules: Dict[int, Dict[Union[str, int], Dict[str, Any]]] = {}
+        self._forum_parent_ids: FrozenSet[int] = frozenset()
+        # forums that have at least one tag-specific template
+        self._forum_tagged_ids: FrozenSet[int] = frozenset()
 
         # Intentionally used for tag lookup (you asked to keep this pattern).
         # In multi-forum mode we set this per-thread before selecting templates.
-        self._forum_templates: Dict[str, Dict[str, Any]] = {}
+        self._forum_templates: Dict[Union[str, int], Dict[str, Any]] = {}
 
-        # Thread IDs we've already handled this runtime
-        self._forum_sent_threads: set[int] = set()
+        # Thread IDs we've already handled this runtime (bounded LRU, see _remember_thread)
+        self._forum_sent_threads: "OrderedDict[int, None]" = OrderedDict()
+
+        # Thread IDs confirmed to carry the bot's first message, found in history or sent by us
+        # (persisted in forum_checked_threads so restarts don't re-fetch every active thread's
+        # history). Bounded the same way; an evicted thread costs one more history fetch at most.
+        self._forum_checked_threads: "OrderedDict[int, None]" = OrderedDict()
+        self._started = False
+
+        # Bot user id, resolved lazily once the client is logged in
+        self._me_id: Optional[int] = None
+        self._cog_started_at = discord.utils.utcnow()
 
         # Per-thread locks so only one send attempt runs at a time for a thread.
-        self._forum_thread_locks: Dict[int, asyncio.Lock] = {}
+        # Weak values: a lock lives only while some flow holds or waits on it.
+        self._forum_thread_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
 
         self.reload_from_config()
 
     def reload_from_config(self) -> None:
         cfg = self.bot.config
+        self._allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
         self._sticky_entries = cfg.get("sticky", "entries", default=[]) or []
+        by_channel: Dict[int, Dict[str, Any]] = {}
+        for e in self._sticky_entries:
+            try:
+                by_channel.setdefault(int(e.get("channel_id")), e)
+            except Exception:
+                continue
+        self._sticky_by_channel = by_channel
 
         # Forum first-message supports either a single config (legacy) or multiple entries.
         self._forum_rules = {}
@@ -48,12 +121,17 @@ class StickyCog(commands.Cog):
                     continue
                 templates = ent.get("templates", {}) or {}
                 if isinstance(templates, dict):
-                    self._forum_rules[ch_id] = templates
+                    self._forum_rules[ch_id] = _normalize_templates(templates)
         else:
             ch_id = cfg.get_int("forum_first_message", "forum_channel_id")
             templates = cfg.get("forum_first_message", "templates", default={}) or {}
             if ch_id and isinstance(templates, dict):
-                self._forum_rules[int(ch_id)] = templates
+                self._forum_rules[int(ch_id)] = _normalize_templates(templates)
+
+        self._forum_parent_ids = frozenset(self._forum_rules)
+        self._forum_tagged_ids = frozenset(
+            ch_id for ch_id, templates in self._forum_rules.items() if any(k != "default" for k in templates)
+        )
 
         # If legacy single-forum config is used, keep _forum_templates pointing there.
         if len(self._forum_rules) == 1:
@@ -64,14 +142,97 @@ class StickyCog(commands.Cog):
     def on_config_reload(self) -> None:
         self.reload_from_config()
 
-    def _get_sticky_for_channel(self, channel_id: int) -> Optional[Dict[str, Any]]:
-        for e in self._sticky_entries:
+    async def start_background(self):
+        if self._started:
+            return
+        self._started = True
+        try:
+            # newest threads only (snowflakes grow with time), inserted oldest first
+            rows = await self.bot.db.fetchall(
+                "SELECT thread_id FROM forum_checked_threads ORDER BY thread_id DESC LIMIT ?",
+                (FORUM_THREAD_CACHE_MAX,),
+            )
+            for r in reversed(rows):
+                _remember_thread(self._forum_checked_threads, int(r["thread_id"]))
+        except Exception:
+            pass
+        try:
+            rows = await self.bot.db.fetchall(
+                "SELECT guild_id, channel_id, last_sticky_message_id FROM sticky_state "
+                "WHERE last_sticky_message_id IS NOT NULL"
+            )
+            for r in rows:
+                # entries written before the load finished are newer than the DB
+                self._last_sticky_ids.setdefault(
+                    (int(r["guild_id"]), int(r["channel_id"])), int(r["last_sticky_message_id"])
+                )
+            self._sticky_state_loaded = True
+        except Exception:
+            pass
+        if self._sticky_dirty:
+            self._schedule_sticky_flush()
+
+    def cog_unload(self):
+        for handle in self._debounce_handles.values():
+            handle.cancel()
+        self._debounce_handles.clear()
+        if self._sticky_flush_task:
+            self._sticky_flush_task.cancel()
+        # cog_unload is sync; hand the pending writes to one last flush
+        if self._sticky_dirty:
             try:
-                if int(e.get("channel_id")) == channel_id:
-                    return e
+                asyncio.get_running_loop().create_task(self._flush_sticky_state())
             except Exception:
-                continue
-        return None
+                pass
+
+    def _schedule_sticky_flush(self) -> None:
+        if self._sticky_flush_task is None or self._sticky_flush_task.done():
+            self._sticky_flush_task = asyncio.create_task(self._sticky_flush_soon())
+
+    async def _sticky_flush_soon(self):
+        # The delay runs from the first pending change and isn't restarted by later ones,
+        # so steady traffic can't postpone the write; changes in the window share one executemany.
+        try:
+            while self._sticky_dirty:
+                await asyncio.sleep(STICKY_FLUSH_DELAY)
+                await self._flush_sticky_state()
+        except asyncio.CancelledError:
+            return
+        except Exception:
+            # the keys were put back; the next sticky send schedules another attempt
+            pass
+
+    async def _flush_sticky_state(self) -> None:
+        if not self._sticky_dirty:
+            return
+        keys = list(self._sticky_dirty)
+        self._sticky_dirty.clear()
+        rows = [(gid, cid, self._last_sticky_ids[(gid, cid)]) for gid, cid in keys if (gid, cid) in self._last_sticky_ids]
+        try:
+            await self.bot.db.executemany(
+                "INSERT INTO sticky_state(guild_id, channel_id, last_sticky_message_id) VALUES(?,?,?) "
+                "ON CONFLICT(guild_id, channel_id) DO UPDATE SET last_sticky_message_id=excluded.last_sticky_message_id",
+                rows,
+            )
+        except BaseException:
+            # keep them for the next pass (re-writing an id that did land is harmless)
+            self._sticky_dirty.update(keys)
+            raise
+
+    async def _mark_thread_checked(self, thread_id: int) -> None:
+        if thread_id in self._forum_checked_threads:
+            return
+        _remember_thread(self._forum_checked_threads, thread_id)
+        try:
+            await self.bot.db.execute(
+                "INSERT OR IGNORE INTO forum_checked_threads(thread_id) VALUES(?)",
+                (thread_id,),
+            )
+        except Exception:
+            pass
+
+    def _get_sticky_for_channel(self, channel_id: int) -> Optional[Dict[str, Any]]:
+        return self._sticky_by_channel.get(channel_id)
 
     # ---------------------------
     # Sticky message feature
@@ -81,9 +242,20 @@ class StickyCog(commands.Cog):
         if message.author.bot or message.guild is None:
             return
 
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        if not ensure_allowed_guild_id(message.guild, allowed_guild_id):
+        # Cheapest rejection first: most channels have neither a sticky nor forum rules.
+        channel = message.channel
+        entry = self._get_sticky_for_channel(channel.id)
+        # Threads already handled are skipped here, before a flow task is created for them.
+        forum_thread = (
+            isinstance(channel, discord.Thread)
+            and channel.parent_id in self._forum_parent_ids
+            and channel.id not in self._forum_sent_threads
+            and channel.id not in self._forum_checked_threads
+        )
+        if not entry and not forum_thread:
+            return
+
+        if message.guild.id != self._allowed_guild_id:
             return
 
         # Forum-first-message fallback:
@@ -91,39 +263,39 @@ class StickyCog(commands.Cog):
         # - checks if the bot already posted in the thread (manual check)
         # - if yes, does nothing
         # - if no, sends
-        try:
-            if isinstance(message.channel, discord.Thread) and message.channel.parent_id in self._forum_rules:
-                asyncio.create_task(self._forum_first_message_flow(message.channel, prefer_normal=False))
-        except Exception:
-            pass
+        if forum_thread:
+            try:
+                asyncio.create_task(self._forum_first_message_flow(channel, prefer_normal=False))
+            except Exception:
+                pass
 
-        entry = self._get_sticky_for_channel(message.channel.id)
         if not entry:
             return
 
-        # debounce per channel
-        task = self._debounce_tasks.get(message.channel.id)
-        if task and not task.done():
-            task.cancel()
+        # debounce per channel: restart the timer; no Task exists until it fires
+        handle = self._debounce_handles.get(channel.id)
+        if handle is not None:
+            handle.cancel()
 
         delay = float(entry.get("delay_seconds", 5) or 5)
-        self._debounce_tasks[message.channel.id] = asyncio.create_task(
-            self._do_sticky(message.channel, message.guild, entry, delay)
+        self._debounce_handles[channel.id] = asyncio.get_running_loop().call_later(
+            delay, self._fire_sticky, channel, message.guild, entry
         )
 
-    async def _do_sticky(self, channel: discord.TextChannel, guild: discord.Guild, entry: Dict[str, Any], delay: float):
-        try:
-            await asyncio.sleep(delay)
-        except asyncio.CancelledError:
-            return
+    def _fire_sticky(self, channel: discord.TextChannel, guild: discord.Guild, entry: Dict[str, Any]) -> None:
+        self._debounce_handles.pop(channel.id, None)
+        asyncio.create_task(self._do_sticky(channel, guild, entry))
 
+    async def _do_sticky(self, channel: discord.TextChannel, guild: discord.Guild, entry: Dict[str, Any]):
         # delete previous sticky
-        db = self.bot.db
-        row = await db.fetchone(
-            "SELECT last_sticky_message_id FROM sticky_state WHERE guild_id=? AND channel_id=?",
-            (guild.id, channel.id),
-        )
-        last_id = int(row["last_sticky_message_id"]) if row and row["last_sticky_message_id"] else None
+        key = (guild.id, channel.id)
+        last_id = self._last_sticky_ids.get(key)
+        if last_id is None and not self._sticky_state_loaded:
+            row = await self.bot.db.fetchone(
+                "SELECT last_sticky_message_id FROM sticky_state WHERE guild_id=? AND channel_id=?",
+                key,
+            )
+            last_id = int(row["last_sticky_message_id"]) if row and row["last_sticky_message_id"] else None
         if last_id:
             try:
                 msg = await channel.fetch_message(last_id)
@@ -137,11 +309,10 @@ class StickyCog(commands.Cog):
 
         try:
             sent = await channel.send(text)
-            await db.execute(
-                "INSERT INTO sticky_state(guild_id, channel_id, last_sticky_message_id) VALUES(?,?,?) "
-                "ON CONFLICT(guild_id, channel_id) DO UPDATE SET last_sticky_message_id=excluded.last_sticky_message_id",
-                (guild.id, channel.id, sent.id),
-            )
+            # persisted by _sticky_flush_soon
+            self._last_sticky_ids[key] = sent.id
+            self._sticky_dirty.add(key)
+            self._schedule_sticky_flush()
         except Exception:
             pass
 
@@ -155,18 +326,27 @@ class StickyCog(commands.Cog):
             self._forum_thread_locks[thread_id] = lock
         return lock
 
-    async def _thread_has_bot_message(self, thread: discord.Thread, limit: int = 25) -> bool:
-        """Manual check: if the bot has already posted in this thread, we shouldn't send again."""
-        me = self.bot.user
-        if me is None:
-            return False
+    async def _thread_has_bot_message(self, thread: discord.Thread) -> Optional[bool]:
+        """Manual check: if the bot has already posted in this thread, we shouldn't send again.
+
+        Returns None when history couldn't be read. For threads this process saw being created
+        recently the embed follows the starter post, so only the two oldest messages are fetched.
+        """
+        me_id = self._me_id
+        if me_id is None:
+            me = self.bot.user
+            if me is None:
+                return False
+            me_id = self._me_id = me.id
+        created = discord.utils.snowflake_time(thread.id)
+        recent = (discord.utils.utcnow() - created).total_seconds() < FORUM_HISTORY_NARROW_WINDOW
+        limit = 2 if created >= self._cog_started_at and recent else FORUM_HISTORY_WIDE_LIMIT
         try:
             async for msg in thread.history(limit=limit, oldest_first=True):
-                if msg.author and msg.author.id == me.id:
+                if msg.author and msg.author.id == me_id:
                     return True
         except Exception:
-            # If we can't read history, play safe and avoid double posting.
-            return True
+            return None
         return False
 
     async def _send_forum_first_message(self, thread: discord.Thread) -> bool:
@@ -183,15 +363,16 @@ class StickyCog(commands.Cog):
 
         # choose template by first matching applied tag, else default
         template = templates.get("default", {}) or {}
-        try:
-            applied = getattr(thread, "applied_tags", []) or []
-            for tag in applied:
-                t = self._forum_templates.get(str(tag.id))
-                if isinstance(t, dict):
-                    template = t
-                    break
-        except Exception:
-            pass
+        if thread.parent_id in self._forum_tagged_ids:
+            try:
+                applied = getattr(thread, "applied_tags", []) or []
+                for tag in applied:
+                    t = self._forum_templates.get(tag.id)
+                    if t is not None:
+                        template = t
+                        break
+            except Exception:
+                pass
 
         title = str(template.get("title", "") or "")
         desc = str(template.get("description", "") or "")
@@ -212,14 +393,14 @@ class StickyCog(commands.Cog):
         if thread.parent_id not in self._forum_rules:
             return
 
-        # Fast skip if already handled in this runtime.
-        if thread.id in self._forum_sent_threads:
+        # Fast skip if already handled (sent this runtime, or history already checked).
+        if thread.id in self._forum_sent_threads or thread.id in self._forum_checked_threads:
             return
 
         lock = self._get_thread_lock(thread.id)
         async with lock:
             # Re-check inside lock.
-            if thread.id in self._forum_sent_threads:
+            if thread.id in self._forum_sent_threads or thread.id in self._forum_checked_threads:
                 return
 
             # If fallback, give normal path time to send first.
@@ -230,30 +411,34 @@ class StickyCog(commands.Cog):
                     pass
 
             # Manual check: if bot already posted in the thread, don't send again.
-            if await self._thread_has_bot_message(thread):
-                self._forum_sent_threads.add(thread.id)
+            has_bot_message = await self._thread_has_bot_message(thread)
+            if has_bot_message is None:
+                # If we can't read history, play safe and avoid double posting; a later
+                # message retries the check, so a transient error isn't remembered.
+                return
+            if has_bot_message:
+                _remember_thread(self._forum_sent_threads, thread.id)
+                await self._mark_thread_checked(thread.id)
                 return
 
             # Try to send with retries (attachment posts can race thread readiness)
-            for attempt in range(6):
+            await asyncio.sleep(1.0)
+            for attempt in range(FORUM_SEND_ATTEMPTS):
                 try:
-                    if attempt == 0:
-                        await asyncio.sleep(1.0)
                     sent = await self._send_forum_first_message(thread)
                     if sent:
-                        self._forum_sent_threads.add(thread.id)
+                        _remember_thread(self._forum_sent_threads, thread.id)
+                        await self._mark_thread_checked(thread.id)
                     return
                 except Exception:
-                    try:
-                        await asyncio.sleep(1.0 + attempt * 0.5)
-                    except Exception:
+                    if attempt == FORUM_SEND_ATTEMPTS - 1:
                         return
+                    # jittered exponential backoff: ~0.5, 1, 2, 4 s ... capped at 8 s
+                    await asyncio.sleep(min(8.0, 0.5 * (2 ** attempt)) + random.random() * 0.1)
 
     @commands.Cog.listener()
     async def on_thread_create(self, thread: discord.Thread):
-        cfg = self.bot.config
-        allowed_guild_id = cfg.get_int("guild", "allowed_guild_id")
-        if thread.guild is None or thread.guild.id != allowed_guild_id:
+        if thread.guild is None or thread.guild.id != self._allowed_guild_id:
             return
 
         if thread.parent_id not in self._forum_rules:
@@ -64,6 +64,10 @@ def create_bot() -> discord.Bot:
         if helpcog:
             await helpcog.start_background()
         
+        stickycog = bot.get_cog("StickyCog")
+        if stickycog:
+            await stickycog.start_background()
+
         bgcog = bot.get_cog("BackgroundCog")
         if bgcog:
             await bgcog.start_background()
@@ -1,17 +1,26 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional, List
+from typing import Iterable, Optional
 import discord
 
+def _member_role_ids(member: discord.Member) -> Iterable[int]:
+    # Member._roles is the raw id array; Member.roles resolves (and sorts) Role objects per access
+    ids = getattr(member, "_roles", None)
+    if ids is not None:
+        return ids
+    return (r.id for r in getattr(member, "roles", []))
+
 def member_has_any_role(member: discord.Member, role_ids: Iterable[int]) -> bool:
-    ids = set(role_ids)
-    return any(r.id in ids for r in getattr(member, "roles", []))
+    ids = role_ids if isinstance(role_ids, (set, frozenset)) else set(role_ids)
+    if not ids:
+        return False
+    return any(rid in ids for rid in _member_role_ids(member))
 
-def is_admin_or_owner(member: discord.Member, admin_role_ids: List[int]) -> bool:
+def is_admin_or_owner(member: discord.Member, admin_role_ids: Iterable[int]) -> bool:
     return member_has_any_role(member, admin_role_ids) or member.guild_permissions.administrator
 
 def is_mod(member: discord.Member, mod_role_id: int) -> bool:
-    return any(r.id == mod_role_id for r in getattr(member, "roles", [])) or member.guild_permissions.manage_guild
+    return (bool(mod_role_id) and mod_role_id in _member_role_ids(member)) or member.guild_permissions.manage_guild
 
 def ensure_allowed_guild_id(guild: Optional[discord.Guild], allowed_guild_id: int) -> bool:
     return guild is not None and guild.id == allowed_guild_id
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import asyncio
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Iterable, List, Optional, Sequence
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
 
 
 class Database:
@@ -11,7 +12,9 @@ class Database:
 
     - Uses a single connection opened with check_same_thread=False
     - Serializes all operations with an asyncio.Lock
-    - Executes each query fully inside one to_thread call to avoid cursor/thread mismatches
+    - Executes each query fully inside one call on a dedicated single-thread executor, so the
+      connection always lives on the same thread and never queues behind other to_thread work
+    - Query methods only await connect() while no connection is open (no lock round-trip once connected)
     """
 
     def __init__(self, path: str):
@@ -19,6 +22,14 @@ class Database:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = asyncio.Lock()
         self._conn: Optional[sqlite3.Connection] = None
+        self._executor = self._new_executor()
+
+    @staticmethod
+    def _new_executor() -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+    def _submit(self, fn):
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn)
 
     async def connect(self) -> None:
         async with self._lock:
@@ -26,14 +37,22 @@ class Database:
                 return
 
             def _open():
-                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                # sqlite3 reuses compiled statements keyed by SQL text; size the cache
+                # above the bot's distinct statements (DDL included) so none get evicted
+                conn = sqlite3.connect(str(self.path), check_same_thread=False, cached_statements=256)
                 conn.row_factory = sqlite3.Row
                 conn.execute("PRAGMA journal_mode=WAL;")
+                # WAL makes NORMAL durable enough and avoids an fsync per commit
+                conn.execute("PRAGMA synchronous=NORMAL;")
+                conn.execute("PRAGMA temp_store=MEMORY;")
+                conn.execute("PRAGMA cache_size=-64000;")  # ~64 MB page cache
+                conn.execute("PRAGMA mmap_size=268435456;")  # read pages via mmap (256 MB window)
+                conn.execute("PRAGMA busy_timeout=5000;")
                 conn.execute("PRAGMA foreign_keys=ON;")
                 conn.commit()
                 return conn
 
-            self._conn = await asyncio.to_thread(_open)
+            self._conn = await self._submit(_open)
 
         await self._migrate()
 
@@ -46,8 +65,12 @@ class Database:
                 assert self._conn is not None
                 self._conn.close()
 
-            await asyncio.to_thread(_close)
+            await self._submit(_close)
             self._conn = None
+            # the worker is idle once _close ran; join it so it doesn't outlive the connection.
+            # A fresh executor starts no thread until a later connect() submits to it.
+            self._executor.shutdown(wait=True)
+            self._executor = self._new_executor()
 
     async def _migrate(self) -> None:
         # Create base tables first
@@ -59,6 +82,8 @@ class Database:
                 count INTEGER NOT NULL DEFAULT 0,
                 PRIMARY KEY (guild_id, user_id, week_start)
             );""",
+            """CREATE INDEX IF NOT EXISTS idx_activity_week_top
+                ON activity_counts(guild_id, week_start, count DESC);""",
             """CREATE TABLE IF NOT EXISTS activity_last_counted(
                 guild_id INTEGER NOT NULL,
                 user_id INTEGER NOT NULL,
@@ -115,6 +140,8 @@ class Database:
             );""",
             """CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_ticket_id
                 ON tickets(guild_id, ticket_id) WHERE ticket_id IS NOT NULL;""",
+            """CREATE INDEX IF NOT EXISTS idx_tickets_guild_status_ts
+                ON tickets(guild_id, status, last_user_activity_ts);""",
             """CREATE TABLE IF NOT EXISTS ticket_sequences(
                 guild_id INTEGER PRIMARY KEY,
                 next_ticket_id INTEGER NOT NULL
@@ -139,6 +166,9 @@ class Database:
                 last_sticky_message_id INTEGER,
                 PRIMARY KEY (guild_id, channel_id)
             );""",
+            """CREATE TABLE IF NOT EXISTS forum_checked_threads(
+                thread_id INTEGER PRIMARY KEY
+            );""",
             """CREATE TABLE IF NOT EXISTS help_sessions(
                 guild_id INTEGER NOT NULL,
                 user_id INTEGER NOT NULL,
@@ -178,6 +208,16 @@ class Database:
         await self._ensure_column("tickets", "ticket_id", "INTEGER")
         await self._ensure_column("transcript_requests", "ticket_id", "INTEGER")
 
+        # Indexes for the transcript request lookups
+        # (created after the column checks since they cover ticket_id)
+        for s in (
+            """CREATE INDEX IF NOT EXISTS idx_tr_guild_ticket_created
+                ON transcript_requests(guild_id, ticket_id, created_ts DESC);""",
+            """CREATE INDEX IF NOT EXISTS idx_tr_guild_channel_created
+                ON transcript_requests(guild_id, ticket_channel_id, created_ts DESC);""",
+        ):
+            await self.execute(s)
+
         # Ensure sequence exists (set next_ticket_id based on max ticket_id)
         async with self._lock:
             assert self._conn is not None
@@ -197,10 +237,11 @@ class Database:
                         )
                 self._conn.commit()
 
-            await asyncio.to_thread(_init_seq)
+            await self._submit(_init_seq)
 
     async def _ensure_column(self, table: str, column: str, coltype: str) -> None:
-        await self.connect()
+        if self._conn is None:
+            await self.connect()
         async with self._lock:
             assert self._conn is not None
 
@@ -217,31 +258,33 @@ class Database:
                     # ignore if cannot alter
                     pass
 
-            await asyncio.to_thread(_run)
+            await self._submit(_run)
 
     async def next_ticket_id(self, guild_id: int) -> int:
-        await self.connect()
+        if self._conn is None:
+            await self.connect()
         async with self._lock:
             assert self._conn is not None
 
             def _run():
                 assert self._conn is not None
-                cur = self._conn.execute("SELECT next_ticket_id FROM ticket_sequences WHERE guild_id=?", (guild_id,))
+                # one atomic upsert: a new guild starts at 1 (next=2), otherwise bump and hand back the old value
+                cur = self._conn.execute(
+                    "INSERT INTO ticket_sequences(guild_id, next_ticket_id) VALUES(?, 2) "
+                    "ON CONFLICT(guild_id) DO UPDATE SET next_ticket_id=next_ticket_id+1 "
+                    "RETURNING next_ticket_id-1 AS id",
+                    (guild_id,),
+                )
                 row = cur.fetchone()
-                if row is None:
-                    next_id = 1
-                    self._conn.execute("INSERT INTO ticket_sequences(guild_id, next_ticket_id) VALUES(?,?)", (guild_id, 2))
-                    self._conn.commit()
-                    return next_id
-                next_id = int(row["next_ticket_id"])
-                self._conn.execute("UPDATE ticket_sequences SET next_ticket_id=? WHERE guild_id=?", (next_id + 1, guild_id))
+                cur.close()
                 self._conn.commit()
-                return next_id
+                return int(row["id"])
 
-            return await asyncio.to_thread(_run)
+            return await self._submit(_run)
 
     async def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
-        await self.connect()
+        if self._conn is None:
+            await self.connect()
         async with self._lock:
             assert self._conn is not None
 
@@ -250,10 +293,11 @@ class Database:
                 self._conn.execute(sql, params)
                 self._conn.commit()
 
-            await asyncio.to_thread(_run)
+            await self._submit(_run)
 
     async def executemany(self, sql: str, seq: Iterable[Sequence[Any]]) -> None:
-        await self.connect()
+        if self._conn is None:
+            await self.connect()
         items = list(seq)
         async with self._lock:
             assert self._conn is not None
@@ -263,10 +307,50 @@ class Database:
                 self._conn.executemany(sql, items)
                 self._conn.commit()
 
-            await asyncio.to_thread(_run)
+            await self._submit(_run)
+
+    async def executebatch(self, items: Iterable[Tuple[str, Sequence[Any]]]) -> None:
+        """Run several (sql, params) statements inside a single transaction."""
+        if self._conn is None:
+            await self.connect()
+        batch = list(items)
+        if not batch:
+            return
+        async with self._lock:
+            assert self._conn is not None
+
+            def _run():
+                assert self._conn is not None
+                try:
+                    for sql, params in batch:
+                        self._conn.execute(sql, params)
+                    self._conn.commit()
+                except Exception:
+                    self._conn.rollback()
+                    raise
+
+            await self._submit(_run)
+
+    async def execute_returning(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        """Run a write with a RETURNING clause, commit it, and return the first row."""
+        if self._conn is None:
+            await self.connect()
+        async with self._lock:
+            assert self._conn is not None
+
+            def _run():
+                assert self._conn is not None
+                cur = self._conn.execute(sql, params)
+                row = cur.fetchone()
+                cur.close()
+                self._conn.commit()
+                return row
+
+            return await self._submit(_run)
 
     async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
-        await self.connect()
+        if self._conn is None:
+            await self.connect()
         async with self._lock:
             assert self._conn is not None
 
@@ -275,10 +359,11 @@ class Database:
                 cur = self._conn.execute(sql, params)
                 return cur.fetchone()
 
-            return await asyncio.to_thread(_run)
+            return await self._submit(_run)
 
     async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
-        await self.connect()
+        if self._conn is None:
+            await self.connect()
         async with self._lock:
             assert self._conn is not None
 
@@ -287,4 +372,4 @@ class Database:
                 cur = self._conn.execute(sql, params)
                 return list(cur.fetchall())
 
-            return await asyncio.to_thread(_run)
+            return await self._submit(_run)
@@ -6,7 +6,10 @@ from typing import Optional
 import discord
 
 async def build_text_transcript(channel: discord.TextChannel, limit: int = 2000) -> io.BytesIO:
-    lines = []
+    # Encode each line straight into the buffer as history pages arrive, rather than
+    # keeping every line, the joined text and its bytes alive at once.
+    bio = io.BytesIO()
+    first = True
     async for msg in channel.history(limit=limit, oldest_first=True):
         ts = msg.created_at.strftime("%Y-%m-%d %H:%M:%S UTC")
         author = f"{msg.author} ({msg.author.id})"
@@ -14,8 +17,8 @@ async def build_text_transcript(channel: discord.TextChannel, limit: int = 2000)
         if msg.attachments:
             att = " ".join(a.url for a in msg.attachments)
             content = (content + " " + att).strip()
-        lines.append(f"[{ts}] {author}: {content}")
-    data = "\n".join(lines).encode("utf-8", errors="replace")
-    bio = io.BytesIO(data)
+        line = f"[{ts}] {author}: {content}"
+        bio.write((line if first else "\n" + line).encode("utf-8", errors="replace"))
+        first = False
     bio.seek(0)
     return bio